@@ -22,6 +22,12 @@ except ImportError:
     print("rdktools C++ extension not built yet. Please build it first.")
     print("Run: uv run python setup.py build_ext --inplace")
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 def create_sample_data() -> np.ndarray:
     """Create sample SMILES data for testing."""
     sample_smiles = [
@@ -42,7 +48,10 @@ def create_sample_data() -> np.ndarray:
     # Create larger dataset by repeating
     large_dataset = sample_smiles * 100  # 1200 molecules
     
-    return np.array(large_dataset, dtype=str)
+    # Object arrays reference the str objects rdktools reads directly (see
+    # rdktools._validate_smiles_input); dtype=str would pad every SMILES to
+    # the longest one
+    return np.asarray(large_dataset, dtype=object)
 
 def demonstrate_basic_functions():
     """Demonstrate basic molecular descriptor calculations."""
@@ -78,6 +87,43 @@ def demonstrate_basic_functions():
     
     print()
 
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _descriptor_sums(mw, logp, tpsa):
+        """Per-descriptor non-NaN counts and sums in a single pass."""
+        counts = np.zeros(3, dtype=np.int64)
+        sums = np.zeros(3)
+        for i in range(mw.shape[0]):
+            if not np.isnan(mw[i]):
+                counts[0] += 1
+                sums[0] += mw[i]
+            if not np.isnan(logp[i]):
+                counts[1] += 1
+                sums[1] += logp[i]
+            if not np.isnan(tpsa[i]):
+                counts[2] += 1
+                sums[2] += tpsa[i]
+        return counts, sums
+else:
+    def _descriptor_sums(mw, logp, tpsa):
+        """Per-descriptor non-NaN counts and sums (NumPy fallback)."""
+        stacked = np.stack([mw, logp, tpsa])
+        valid = ~np.isnan(stacked)
+        return valid.sum(axis=1), np.where(valid, stacked, 0.0).sum(axis=1)
+
+def _summarize(results) -> dict:
+    """Valid count and NaN-skipping descriptor means from one pass over the results."""
+    counts, sums = _descriptor_sums(
+        results['molecular_weight'], results['logp'], results['tpsa']
+    )
+    means = np.divide(sums, counts, out=np.full(3, np.nan), where=counts > 0)
+    return {
+        'n_valid': int(counts[0]),
+        'molecular_weight': means[0],
+        'logp': means[1],
+        'tpsa': means[2],
+    }
+
 def demonstrate_batch_processing():
     """Demonstrate efficient batch processing of large datasets."""
     print("=== Batch Processing Demonstration ===")
@@ -103,14 +149,13 @@ def demonstrate_batch_processing():
     print(f"Rate: {len(large_smiles)/processing_time:.0f} molecules/second")
     
     # Show some statistics
-    valid_mask = ~np.isnan(results['molecular_weight'])
-    n_valid = np.sum(valid_mask)
+    summary = _summarize(results)
     
     print(f"\nResults summary:")
-    print(f"Valid molecules: {n_valid}/{len(large_smiles)}")
-    print(f"Average molecular weight: {np.nanmean(results['molecular_weight']):.2f}")
-    print(f"Average LogP: {np.nanmean(results['logp']):.2f}")
-    print(f"Average TPSA: {np.nanmean(results['tpsa']):.2f}")
+    print(f"Valid molecules: {summary['n_valid']}/{len(large_smiles)}")
+    print(f"Average molecular weight: {summary['molecular_weight']:.2f}")
+    print(f"Average LogP: {summary['logp']:.2f}")
+    print(f"Average TPSA: {summary['tpsa']:.2f}")
     
     print()
 
@@ -137,14 +182,18 @@ def demonstrate_fingerprints():
         n_bits_set = np.sum(fps[i])
         print(f"  {smi}: {n_bits_set} bits set")
     
-    # Calculate Tanimoto similarity between first two molecules
-    fp1, fp2 = fps[0], fps[1]
-    intersection = np.sum(fp1 & fp2)
-    union = np.sum(fp1 | fp2)
-    tanimoto = intersection / union if union > 0 else 0.0
+    # Calculate Tanimoto similarity between first two molecules on the
+    # bit-packed form (64 bits per uint64 word, popcount-based)
+    packed = rdktools.morgan_fingerprints(smiles, radius=2, nbits=1024, packed=True)
+    print(f"Packed fingerprint shape: {packed.shape} ({packed.nbytes} vs {fps.nbytes} bytes)")
+    tanimoto = rdktools.tanimoto(packed[0], packed[1])
     
     print(f"Tanimoto similarity between '{smiles[0]}' and '{smiles[1]}': {tanimoto:.3f}")
     
+    # All-pairs similarity matrix in a single call
+    similarity = rdktools.tanimoto_matrix(packed, packed)
+    print(f"Pairwise similarity matrix:\n{np.round(similarity, 3)}")
+    
     print()
 
 def demonstrate_advanced_batch():
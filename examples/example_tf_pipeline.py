@@ -41,24 +41,17 @@ def main():
     # Method 2: Using tf.data pipeline with custom operation
     print("🔧 Method 2: tf.data pipeline with custom operation")
     
-    # Create dataset
-    dataset = tf.data.Dataset.from_tensor_slices(smiles_data)
-    
-    # Apply custom string processing operation
-    dataset = dataset.map(
-        lambda x: string_process(x),
-        num_parallel_calls=tf.data.AUTOTUNE
+    # Batch before mapping: the op processes a whole batch tensor per call
+    # (spread over TF's intra-op threads) instead of one SMILES per call
+    dataset = (tf.data.Dataset.from_tensor_slices(smiles_data)
+        .batch(3)
+        .map(string_process, num_parallel_calls=tf.data.AUTOTUNE)
+        .prefetch(tf.data.AUTOTUNE)
     )
     
-    # Batch the data
-    dataset = dataset.batch(3)
-    
-    # Prefetch for performance
-    dataset = dataset.prefetch(tf.data.AUTOTUNE)
-    
     print("Processing batches:")
-    for i, batch in enumerate(dataset):
-        print(f"  Batch {i+1}: {batch.numpy()}")
+    for i, (traces, fingerprints) in enumerate(dataset):
+        print(f"  Batch {i+1}: {traces.shape[0]} traces, fingerprints {fingerprints.shape}")
     
     print("✅ Pipeline processing completed\n")
     
@@ -76,28 +69,23 @@ def main():
     # Method 4: Simulating a real data pipeline
     print("🔧 Method 4: Realistic data pipeline simulation")
     
-    # Simulate reading from files or database
-    def simulate_data_source():
-        """Simulate a data source that yields SMILES strings."""
-        for smiles in smiles_data:
-            yield smiles
-    
-    # Create dataset from generator
-    dataset = tf.data.Dataset.from_generator(
-        simulate_data_source,
-        output_signature=tf.TensorSpec(shape=(), dtype=tf.string)
-    )
+    # In-memory data stays inside the TF runtime: from_tensor_slices avoids the
+    # per-element Python round trip of from_generator, and cache() keeps the
+    # decoded strings for later epochs. For file-backed data, read with
+    # tf.data.TextLineDataset(files) interleaved via
+    # .interleave(..., cycle_length=tf.data.AUTOTUNE, num_parallel_calls=tf.data.AUTOTUNE).
+    dataset = tf.data.Dataset.from_tensor_slices(tf.constant(smiles_data)).cache()
     
     # Apply transformations
     dataset = (dataset
-        .map(string_process, num_parallel_calls=tf.data.AUTOTUNE)  # Custom C++ op
         .batch(2)
+        .map(string_process, num_parallel_calls=tf.data.AUTOTUNE)  # Custom C++ op
         .prefetch(tf.data.AUTOTUNE)
     )
     
     print("Realistic pipeline processing:")
-    for i, batch in enumerate(dataset):
-        print(f"  Batch {i+1}: {batch.numpy()}")
+    for i, (traces, fingerprints) in enumerate(dataset):
+        print(f"  Batch {i+1}: {traces.shape[0]} traces, fingerprints {fingerprints.shape}")
     
     print("✅ Realistic pipeline completed\n")
     
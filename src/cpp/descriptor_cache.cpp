@@ -0,0 +1,110 @@
+#include "descriptor_cache.hpp"
+#include <array>
+#include <atomic>
+#include <cstdint>
+#include <functional>
+#include <list>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <utility>
+
+namespace rdktools {
+
+namespace {
+
+// Independent LRU shards, so parallel kernels rarely wait on the same lock
+constexpr std::size_t kStripes = 256;
+constexpr std::size_t kDefaultCapacity = std::size_t{1} << 16;
+
+struct Stripe {
+    using Entry = std::pair<std::string, DescriptorTriple>;
+
+    std::mutex mutex;
+    // Most recently used first; the index keys view the list's strings
+    std::list<Entry> entries;
+    std::unordered_map<std::string_view, std::list<Entry>::iterator> index;
+
+    void evict_to(std::size_t capacity) {
+        while (entries.size() > capacity) {
+            index.erase(entries.back().first);
+            entries.pop_back();
+        }
+    }
+};
+
+std::atomic<std::size_t> g_capacity{kDefaultCapacity};
+std::array<Stripe, kStripes> g_stripes;
+
+std::size_t stripe_index(std::string_view smiles) {
+    // Pick the stripe from the high hash bits; the stripe's own map buckets
+    // on the low ones
+    const auto hash = static_cast<std::uint64_t>(std::hash<std::string_view>{}(smiles));
+    return static_cast<std::size_t>((hash * 0x9E3779B97F4A7C15ULL) >> 56);
+}
+
+// Share of the capacity held by one stripe. The remainder goes one entry
+// each to the first stripes, so the stripes together hold at most capacity
+// entries; below kStripes some stripes hold none.
+std::size_t stripe_capacity(std::size_t capacity, std::size_t stripe) {
+    return capacity / kStripes + (stripe < capacity % kStripes ? 1 : 0);
+}
+
+} // namespace
+
+void set_descriptor_cache_size(std::size_t capacity) {
+    g_capacity.store(capacity);
+    for (std::size_t i = 0; i < kStripes; ++i) {
+        std::lock_guard<std::mutex> guard(g_stripes[i].mutex);
+        g_stripes[i].evict_to(stripe_capacity(capacity, i));
+    }
+}
+
+std::size_t get_descriptor_cache_size() {
+    return g_capacity.load();
+}
+
+void clear_descriptor_cache() {
+    for (auto& stripe : g_stripes) {
+        std::lock_guard<std::mutex> guard(stripe.mutex);
+        stripe.index.clear();
+        stripe.entries.clear();
+    }
+}
+
+bool descriptor_cache_lookup(std::string_view smiles, DescriptorTriple& values) {
+    if (g_capacity.load(std::memory_order_relaxed) == 0) {
+        return false;
+    }
+    Stripe& stripe = g_stripes[stripe_index(smiles)];
+    std::lock_guard<std::mutex> guard(stripe.mutex);
+    auto it = stripe.index.find(smiles);
+    if (it == stripe.index.end()) {
+        return false;
+    }
+    stripe.entries.splice(stripe.entries.begin(), stripe.entries, it->second);
+    values = it->second->second;
+    return true;
+}
+
+void descriptor_cache_insert(std::string_view smiles, const DescriptorTriple& values) {
+    const std::size_t i = stripe_index(smiles);
+    const std::size_t per_stripe = stripe_capacity(g_capacity.load(std::memory_order_relaxed), i);
+    if (per_stripe == 0) {
+        return;
+    }
+    Stripe& stripe = g_stripes[i];
+    std::lock_guard<std::mutex> guard(stripe.mutex);
+    auto it = stripe.index.find(smiles);
+    if (it != stripe.index.end()) {
+        // Another thread computed the same SMILES first
+        stripe.entries.splice(stripe.entries.begin(), stripe.entries, it->second);
+        it->second->second = values;
+        return;
+    }
+    stripe.entries.emplace_front(std::string(smiles), values);
+    stripe.index.emplace(stripe.entries.front().first, stripe.entries.begin());
+    stripe.evict_to(per_stripe);
+}
+
+} // namespace rdktools
@@ -0,0 +1,52 @@
+#pragma once
+
+#include <cstddef>
+#include <string_view>
+
+namespace rdktools {
+
+/**
+ * @brief Molecular weight, LogP and TPSA of one SMILES string
+ *
+ * All three values are NaN for SMILES that fail to parse.
+ */
+struct DescriptorTriple {
+    double molecular_weight;
+    double logp;
+    double tpsa;
+};
+
+/**
+ * @brief Set the maximum number of SMILES kept in the descriptor cache
+ * @param capacity entry count; 0 disables and empties the cache
+ */
+void set_descriptor_cache_size(std::size_t capacity);
+
+/**
+ * @brief Maximum number of SMILES kept in the descriptor cache
+ */
+std::size_t get_descriptor_cache_size();
+
+/**
+ * @brief Drop every cached descriptor triple
+ */
+void clear_descriptor_cache();
+
+/**
+ * @brief Look up the cached descriptors of a SMILES string
+ *
+ * Safe to call from several threads at once.
+ *
+ * @param smiles SMILES string, compared byte for byte
+ * @param values receives the cached triple on a hit
+ * @return whether the SMILES was cached
+ */
+bool descriptor_cache_lookup(std::string_view smiles, DescriptorTriple& values);
+
+/**
+ * @brief Cache the descriptors of a SMILES string, evicting the least
+ *        recently used entries beyond capacity
+ */
+void descriptor_cache_insert(std::string_view smiles, const DescriptorTriple& values);
+
+} // namespace rdktools
@@ -12,12 +12,12 @@
 #include <GraphMol/Subgraphs/Subgraphs.h>
 #include <RDGeneral/RDLog.h>
 #include <algorithm>
+#include <charconv>
 #include <limits>
 #include <map>
 #include <memory>
 #include <mutex>
 #include <set>
-#include <sstream>
 #include <string>
 #include <tuple>
 #include <unordered_map>
@@ -134,27 +134,26 @@ auto complexity_key(const std::string& token) {
                            metrics.hasUnsat, metrics.token);
 }
 
-std::string join_lines(const std::vector<std::string>& lines) {
-    std::ostringstream oss;
-    for (std::size_t i = 0; i < lines.size(); ++i) {
-        if (i != 0) {
-            oss << '\n';
-        }
-        oss << lines[i];
-    }
-    return oss.str();
+// Append the decimal digits of value, without a stream or locale
+void append_uint(std::string& out, unsigned int value) {
+    char digits[std::numeric_limits<unsigned int>::digits10 + 1];
+    const auto result = std::to_chars(digits, digits + sizeof(digits), value);
+    out.append(digits, result.ptr);
 }
 
-std::string join_with(const std::vector<std::string>& items,
-                      const std::string& separator) {
-    std::ostringstream oss;
-    for (std::size_t i = 0; i < items.size(); ++i) {
-        if (i != 0) {
-            oss << separator;
+// Distinct (center, radius) environments of a Morgan bit-info map
+template <typename InfoMap>
+std::set<CenterRadiusPair> environment_pairs(const InfoMap& bitInfo,
+                                             unsigned int radius) {
+    std::set<CenterRadiusPair> pairs;
+    for (const auto& entry : bitInfo) {
+        for (const auto& occurrence : entry.second) {
+            if (occurrence.second <= radius) {
+                pairs.emplace(occurrence.first, occurrence.second);
+            }
         }
-        oss << items[i];
     }
-    return oss.str();
+    return pairs;
 }
 
 BitInfoMap collect_morgan_bitinfo(const RDKit::ROMol& mol, unsigned int radius,
@@ -174,18 +173,24 @@ BitInfoMap collect_morgan_bitinfo(const RDKit::ROMol& mol, unsigned int radius,
                                        : BitInfoMap{};
 }
 
-std::vector<std::uint8_t> compute_morgan_fingerprint_bits(
+// Write the folded Morgan fingerprint into the zeroed bits[0, fingerprint_size).
+// When environments is given, it receives the (center, radius) pairs that set
+// bits, recorded during the same Morgan pass. Returns false on failure, with
+// bits left zeroed.
+bool compute_morgan_fingerprint_bits(
     const RDKit::ROMol& mol,
     unsigned int radius,
     bool includeChirality,
-    std::size_t fingerprint_size) {
-    std::vector<std::uint8_t> bits(fingerprint_size, 0);
+    std::uint8_t* bits,
+    std::size_t fingerprint_size,
+    std::set<CenterRadiusPair>* environments) {
     if (fingerprint_size == 0 ||
         fingerprint_size > std::numeric_limits<unsigned int>::max()) {
-        return bits;
+        return false;
     }
     const auto num_bits =
         static_cast<unsigned int>(fingerprint_size);
+    RDKit::MorganFingerprints::BitInfoMap bitInfo;
     try {
         std::unique_ptr<::ExplicitBitVect> fp(
             RDKit::MorganFingerprints::getFingerprintAsBitVect(
@@ -197,25 +202,32 @@ std::vector<std::uint8_t> compute_morgan_fingerprint_bits(
                 includeChirality,
                 true,
                 false,
-                nullptr));
+                environments ? &bitInfo : nullptr));
         if (!fp) {
-            return bits;
+            return false;
         }
 
-        for (unsigned int idx = 0;
-             idx < num_bits; ++idx) {
-            bits[idx] = fp->getBit(idx) ? 1U : 0U;
+        // Fingerprints are sparse, so only the set bits are written
+        const auto& set_bits = *fp->dp_bits;
+        for (auto bit = set_bits.find_first(); bit != set_bits.npos;
+             bit = set_bits.find_next(bit)) {
+            bits[bit] = 1U;
         }
     } catch (const std::exception&) {
-        // Leave bits zeroed on failure.
+        std::fill(bits, bits + fingerprint_size, 0);
+        return false;
     }
-    return bits;
+    if (environments) {
+        *environments = environment_pairs(bitInfo, radius);
+    }
+    return true;
 }
 
 std::map<unsigned int, std::map<unsigned int, std::string>>
 ecfp_env_tokens_by_center(const RDKit::ROMol& source, unsigned int radius,
                           bool isomeric, bool kekulize,
-                          bool include_radius_tag, bool mark_root) {
+                          bool include_radius_tag, bool mark_root,
+                          const std::set<CenterRadiusPair>* known_pairs) {
     RDKit::RWMol mol(source);
     if (kekulize) {
         try {
@@ -225,14 +237,14 @@ ecfp_env_tokens_by_center(const RDKit::ROMol& source, unsigned int radius,
         }
     }
 
-    BitInfoMap bitInfo = collect_morgan_bitinfo(mol, radius, isomeric);
+    // Environments found by the fingerprint pass are reused; kekulizing
+    // changes the bond types, so those molecules need their own Morgan pass
     std::set<CenterRadiusPair> pairs;
-    for (const auto& entry : bitInfo) {
-        for (const auto& occurrence : entry.second) {
-            if (occurrence.second <= radius) {
-                pairs.emplace(occurrence.first, occurrence.second);
-            }
-        }
+    if (known_pairs && !kekulize) {
+        pairs = *known_pairs;
+    } else {
+        pairs = environment_pairs(
+            collect_morgan_bitinfo(mol, radius, isomeric), radius);
     }
 
     std::vector<int> originalMapNums;
@@ -281,14 +293,17 @@ ecfp_env_tokens_by_center(const RDKit::ROMol& source, unsigned int radius,
             }
         }
 
-        std::ostringstream oss;
         if (include_radius_tag) {
-            oss << 'r' << layer << ':' << smarts;
+            std::string token;
+            token.reserve(smarts.size() + 4);
+            token.push_back('r');
+            append_uint(token, layer);
+            token.push_back(':');
+            token.append(smarts);
+            perCenter[center][layer] = std::move(token);
         } else {
-            oss << smarts;
+            perCenter[center][layer] = std::move(smarts);
         }
-
-        perCenter[center][layer] = oss.str();
     }
 
     return perCenter;
@@ -306,26 +321,30 @@ std::unique_ptr<RDKit::ROMol> smiles_to_mol(const std::string& smiles) {
 
 namespace rdktools {
 
-ReasoningTraceResult ecfp_reasoning_trace_from_smiles(
+std::string ecfp_reasoning_trace_into(
     const std::string& smiles,
     unsigned int radius,
     bool isomeric,
     bool kekulize,
     bool include_per_center,
+    std::uint8_t* fingerprint,
     std::size_t fingerprint_size) {
-    std::vector<std::uint8_t> fingerprint(
-        fingerprint_size,
-        static_cast<std::uint8_t>(0));
+    std::fill(fingerprint, fingerprint + fingerprint_size, 0);
 
     auto mol = smiles_to_mol(smiles);
     if (!mol) {
-        return {std::string(), std::move(fingerprint)};
+        return std::string();
     }
 
+    // One Morgan pass yields both the fingerprint bits and the environments
+    // the trace describes
+    std::set<CenterRadiusPair> environments;
+    const bool have_environments = compute_morgan_fingerprint_bits(
+        *mol, radius, isomeric, fingerprint, fingerprint_size,
+        kekulize ? nullptr : &environments);
     const auto per_center = ecfp_env_tokens_by_center(
-        *mol, radius, isomeric, kekulize, true, true);
-    fingerprint = compute_morgan_fingerprint_bits(
-        *mol, radius, isomeric, fingerprint_size);
+        *mol, radius, isomeric, kekulize, true, true,
+        have_environments ? &environments : nullptr);
 
     std::map<unsigned int, std::map<std::string, unsigned int>> by_radius;
     for (const auto& center_entry : per_center) {
@@ -334,7 +353,15 @@ ReasoningTraceResult ecfp_reasoning_trace_from_smiles(
         }
     }
 
-    std::vector<std::string> lines;
+    // The trace is appended to one buffer, a line at a time
+    std::string trace;
+    trace.reserve(256);
+    auto start_line = [&trace]() {
+        if (!trace.empty()) {
+            trace.push_back('\n');
+        }
+    };
+
     for (const auto& radius_entry : by_radius) {
         std::vector<std::pair<std::string, unsigned int>> tokens(
             radius_entry.second.begin(), radius_entry.second.end());
@@ -344,22 +371,24 @@ ReasoningTraceResult ecfp_reasoning_trace_from_smiles(
                              complexity_key(rhs.first);
                   });
 
-        std::vector<std::string> pieces;
-        pieces.reserve(tokens.size());
-        for (const auto& token_count : tokens) {
-            std::ostringstream oss;
-            oss << token_count.first << kCountSeparator << token_count.second;
-            pieces.push_back(oss.str());
+        start_line();
+        trace.push_back('r');
+        append_uint(trace, radius_entry.first);
+        trace.append(": ");
+        for (std::size_t i = 0; i < tokens.size(); ++i) {
+            if (i != 0) {
+                trace.append(", ");
+            }
+            trace.append(tokens[i].first);
+            trace.append(kCountSeparator);
+            append_uint(trace, tokens[i].second);
         }
-
-        std::ostringstream line;
-        line << 'r' << radius_entry.first << ": " << join_with(pieces, ", ");
-        lines.push_back(line.str());
     }
 
     if (include_per_center && !per_center.empty()) {
-        lines.emplace_back("");
-        lines.emplace_back("# per-center chains");
+        // An empty line separates the chains from the aggregated tokens
+        start_line();
+        trace.append("\n# per-center chains");
 
         for (const auto& center_entry : per_center) {
             const unsigned int atom_idx = center_entry.first;
@@ -372,20 +401,20 @@ ReasoningTraceResult ecfp_reasoning_trace_from_smiles(
                           return lhs.first < rhs.first;
                       });
 
-            std::vector<std::string> tokens;
-            tokens.reserve(chain.size());
-            for (const auto& item : chain) {
-                tokens.push_back(item.second);
+            start_line();
+            trace.append(atom->getSymbol());
+            append_uint(trace, atom_idx);
+            trace.append(": ");
+            for (std::size_t i = 0; i < chain.size(); ++i) {
+                if (i != 0) {
+                    trace.append(kChainArrow);
+                }
+                trace.append(chain[i].second);
             }
-
-            std::ostringstream line;
-            line << atom->getSymbol() << atom_idx << ": "
-                 << join_with(tokens, kChainArrow);
-            lines.push_back(line.str());
         }
     }
 
-    return {join_lines(lines), std::move(fingerprint)};
+    return trace;
 }
 
 } // namespace rdktools
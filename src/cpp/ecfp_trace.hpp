@@ -4,22 +4,29 @@
 #include <cstddef>
 #include <cstdint>
 #include <string>
-#include <tuple>
 #include <vector>
 
 namespace rdktools {
 
 inline constexpr std::size_t kECFPReasoningFingerprintSize = 2048;
 
-using ReasoningTraceResult =
-    std::tuple<std::string, std::vector<std::uint8_t>>;
-
-ReasoningTraceResult ecfp_reasoning_trace_from_smiles(
+/**
+ * @brief Generate an ECFP reasoning trace, writing the fingerprint in place
+ *
+ * The fingerprint and the environments listed in the trace come from the
+ * same Morgan pass over the molecule (a kekulized trace needs a second one).
+ *
+ * @param fingerprint buffer of fingerprint_size bytes receiving one 0/1 byte
+ *        per bit; zeroed for invalid SMILES
+ * @return multi-line trace text, empty for invalid SMILES
+ */
+std::string ecfp_reasoning_trace_into(
     const std::string& smiles,
     unsigned int radius,
     bool isomeric,
     bool kekulize,
     bool include_per_center,
-    std::size_t fingerprint_size = kECFPReasoningFingerprintSize);
+    std::uint8_t* fingerprint,
+    std::size_t fingerprint_size);
 
 } // namespace rdktools
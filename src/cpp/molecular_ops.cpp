@@ -1,5 +1,8 @@
 #include "molecular_ops.hpp"
+#include "descriptor_cache.hpp"
 #include "ecfp_trace.hpp"
+#include "parallel.hpp"
+#include <DataStructs/ExplicitBitVect.h>
 #include <GraphMol/Descriptors/MolDescriptors.h>
 #include <GraphMol/Fingerprints/MorganFingerprints.h>
 #include <GraphMol/FileParsers/MolSupplier.h>
@@ -7,209 +10,824 @@
 #include <GraphMol/SmilesParse/SmilesParse.h>
 #include <GraphMol/SmilesParse/SmilesWrite.h>
 #include <RDGeneral/RDLog.h>
+#include <boost/dynamic_bitset.hpp>
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+#include <immintrin.h>
+#endif
 #include <algorithm>
+#include <array>
+#include <cmath>
+#include <cstdlib>
 #include <iostream>
 #include <limits>
 #include <map>
 #include <memory>
+#include <mutex>
+#include <new>
 #include <set>
 #include <sstream>
 #include <stdexcept>
+#include <type_traits>
+#include <unordered_map>
+#include <string_view>
+#include <unistd.h>
 
 namespace rdktools {
 
 namespace nb = nanobind;
 
+// Bytes that may appear in the SMILES part of a string: atoms, bonds
+// (including dative "->"/"<-"), branches, ring closures and bracket atoms
+constexpr std::array<bool, 256> make_smiles_charset() {
+    std::array<bool, 256> allowed{};
+    for (int c = '0'; c <= '9'; ++c) allowed[c] = true;
+    for (int c = 'A'; c <= 'Z'; ++c) allowed[c] = true;
+    for (int c = 'a'; c <= 'z'; ++c) allowed[c] = true;
+    for (unsigned char c : std::string_view("@+-=#$/\\%().[]*:<>")) allowed[c] = true;
+    return allowed;
+}
+
+constexpr std::array<bool, 256> kSmilesCharset = make_smiles_charset();
+
+// Cheap pre-parse rejection of strings with characters SMILES cannot contain.
+// Leading whitespace is skipped; scanning then stops at the next whitespace:
+// what follows is a molecule name or CXSMILES extension, which is left to the
+// parser.
+bool has_smiles_charset(std::string_view smiles) {
+    auto is_space = [](unsigned char c) {
+        return c == ' ' || c == '\t' || c == '\n' || c == '\r';
+    };
+    std::size_t i = 0;
+    while (i < smiles.size() && is_space(static_cast<unsigned char>(smiles[i]))) {
+        ++i;
+    }
+    for (; i < smiles.size(); ++i) {
+        const auto c = static_cast<unsigned char>(smiles[i]);
+        if (is_space(c)) {
+            return true;
+        }
+        if (!kSmilesCharset[c]) {
+            return false;
+        }
+    }
+    return true;
+}
+
+// Silences RDKit's logs (such as "SMILES Parse Error") while a batch runs:
+// invalid SMILES are already reported as NaN or false, and writing a log line
+// per failure costs more than the failed parse. RDKit's log state is
+// process-wide, so overlapping batches share one BlockLogs, released when the
+// last of them finishes. RDKit messages from unrelated threads are dropped
+// meanwhile as well.
+class QuietBatch {
+public:
+    QuietBatch() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        if (active_++ == 0) {
+            block_.emplace();
+        }
+    }
+    ~QuietBatch() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        if (--active_ == 0) {
+            block_.reset();
+        }
+    }
+    QuietBatch(const QuietBatch&) = delete;
+    QuietBatch& operator=(const QuietBatch&) = delete;
+
+private:
+    static inline std::mutex mutex_;
+    static inline size_t active_ = 0;
+    static inline std::optional<RDLog::BlockLogs> block_;
+};
+
 // Helper function to create molecule from SMILES
-std::unique_ptr<RDKit::ROMol> smiles_to_mol(const std::string& smiles) {
+std::unique_ptr<RDKit::ROMol> smiles_to_mol(std::string_view smiles) {
+    if (!has_smiles_charset(smiles)) {
+        return nullptr;
+    }
+    // Default parser settings, built once rather than per call
+    static const RDKit::SmilesParserParams params;
+    // SmilesToMol needs a std::string; reusing a per-thread buffer keeps its
+    // capacity, so SMILES longer than the small-string buffer stop costing a
+    // heap allocation per parse
+    thread_local std::string buffer;
     try {
-        std::unique_ptr<RDKit::ROMol> mol(RDKit::SmilesToMol(smiles));
+        buffer.assign(smiles.data(), smiles.size());
+        std::unique_ptr<RDKit::ROMol> mol(RDKit::SmilesToMol(buffer, params));
         return mol;
     } catch (const std::exception& e) {
         return nullptr;
     }
 }
 
-nb::ndarray<nb::numpy, double> calculate_molecular_weights(const std::vector<std::string>& smiles_list) {
+// Fill one fingerprint row; invalid molecules and failures leave it zeroed
+void write_fingerprint_row(const RDKit::ROMol* mol, int radius, int nbits, uint8_t* row) {
+    std::fill(row, row + nbits, 0);
+    if (!mol) {
+        return;
+    }
+    try {
+        std::unique_ptr<ExplicitBitVect> fp(
+            RDKit::MorganFingerprints::getFingerprintAsBitVect(*mol, radius, nbits));
+        // Fingerprints are sparse, so only the set bits are written
+        const auto& bits = *fp->dp_bits;
+        for (auto bit = bits.find_first(); bit != bits.npos; bit = bits.find_next(bit)) {
+            row[bit] = 1;
+        }
+    } catch (const std::exception& e) {
+        std::fill(row, row + nbits, 0);
+    }
+}
+
+// Overwrite a row of packed words with a bit vector (bit j in word j / 64,
+// position j % 64)
+void pack_bit_vect(const ExplicitBitVect& fp, uint64_t* row, size_t words) {
+    const auto& bits = *fp.dp_bits;
+    using Block = typename std::decay_t<decltype(bits)>::block_type;
+    if constexpr (sizeof(Block) == sizeof(uint64_t)) {
+        // dynamic_bitset blocks already use the packed layout and cover the
+        // whole row, so they are copied wholesale without clearing it first
+        boost::to_block_range(bits, row);
+    } else {
+        std::fill(row, row + words, 0);
+        for (auto bit = bits.find_first(); bit != bits.npos; bit = bits.find_next(bit)) {
+            row[bit / 64] |= uint64_t{1} << (bit % 64);
+        }
+    }
+}
+
+// Packed outputs larger than half of L2 are written with non-temporal stores,
+// so they do not evict the parser's working set. Smaller outputs stay cached:
+// with dedup the caller reads the unique rows straight back to scatter them.
+size_t streaming_store_bytes() {
+    static const size_t bytes = [] {
+        long l2 = 0;
+#ifdef _SC_LEVEL2_CACHE_SIZE
+        l2 = sysconf(_SC_LEVEL2_CACHE_SIZE);
+#endif
+        // Assume a 2 MiB L2 where the size is not reported
+        return (l2 > 0 ? static_cast<size_t>(l2) : size_t{2} << 20) / 2;
+    }();
+    return bytes;
+}
+
+// Copy words to dst with cache-bypassing stores where the CPU has them. The
+// stores are weakly ordered: every thread that issued them must call
+// stream_fence before leaving the parallel region.
+void stream_words(uint64_t* dst, const uint64_t* src, size_t words) {
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+    // 8-byte MOVNTI rather than 32-byte VMOVNTDQ: it only needs the 8-byte
+    // alignment numpy rows already have, and the write-combining buffers
+    // merge the stores into full cache lines either way
+    for (size_t w = 0; w < words; ++w) {
+        _mm_stream_si64(reinterpret_cast<long long*>(dst + w), static_cast<long long>(src[w]));
+    }
+#else
+    std::copy(src, src + words, dst);
+#endif
+}
+
+// Order this thread's stream_words stores before the output is handed back
+void stream_fence() {
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+    _mm_sfence();
+#endif
+}
+
+// Fill one packed fingerprint row of packed_words(nbits) uint64 words; only
+// invalid molecules and failures are cleared
+void write_packed_fingerprint_row(const RDKit::ROMol* mol, int radius, int nbits, uint64_t* row) {
+    const size_t words = packed_words(nbits);
+    if (!mol) {
+        std::fill(row, row + words, 0);
+        return;
+    }
+    try {
+        std::unique_ptr<ExplicitBitVect> fp(
+            RDKit::MorganFingerprints::getFingerprintAsBitVect(*mol, radius, nbits));
+        pack_bit_vect(*fp, row, words);
+    } catch (const std::exception& e) {
+        std::fill(row, row + words, 0);
+    }
+}
+
+// Build one packed fingerprint row in per-thread scratch and write it out
+// with stream_words
+void stream_packed_fingerprint_row(const RDKit::ROMol* mol, int radius, int nbits, uint64_t* row) {
+    const size_t words = packed_words(nbits);
+    thread_local std::vector<uint64_t> scratch;
+    scratch.resize(words);
+    write_packed_fingerprint_row(mol, radius, nbits, scratch.data());
+    stream_words(row, scratch.data(), words);
+}
+
+// Throw unless a caller-provided buffer has one row per SMILES string
+void check_rows(size_t rows, size_t size, const char* name) {
+    if (rows != size) {
+        throw std::invalid_argument(
+            std::string(name) + " must have one row per SMILES string");
+    }
+}
+
+double molecular_weight_of(const RDKit::ROMol& mol) {
+    return RDKit::Descriptors::calcAMW(mol);
+}
+
+double logp_of(const RDKit::ROMol& mol) {
+    return RDKit::Descriptors::calcClogP(mol);
+}
+
+double tpsa_of(const RDKit::ROMol& mol) {
+    return RDKit::Descriptors::calcTPSA(mol);
+}
+
+// All descriptors of one parsed molecule; NaN for a failed parse
+DescriptorTriple compute_descriptors(const RDKit::ROMol* mol) {
+    if (!mol) {
+        const double nan = std::numeric_limits<double>::quiet_NaN();
+        return {nan, nan, nan};
+    }
+    return {molecular_weight_of(*mol), logp_of(*mol), tpsa_of(*mol)};
+}
+
+// Descriptors of an already parsed SMILES, reusing cached values when present
+DescriptorTriple describe_parsed(std::string_view smiles, const RDKit::ROMol* mol) {
+    DescriptorTriple values;
+    if (!descriptor_cache_lookup(smiles, values)) {
+        values = compute_descriptors(mol);
+        descriptor_cache_insert(smiles, values);
+    }
+    return values;
+}
+
+// All descriptors of one SMILES, served from the descriptor cache when the
+// same string was seen before; only misses are parsed
+DescriptorTriple describe_smiles(std::string_view smiles) {
+    DescriptorTriple values;
+    if (descriptor_cache_lookup(smiles, values)) {
+        return values;
+    }
+    auto mol = smiles_to_mol(smiles);
+    values = compute_descriptors(mol.get());
+    descriptor_cache_insert(smiles, values);
+    return values;
+}
+
+// Pointer to the DescriptorTriple member a kernel reports
+using Descriptor = double DescriptorTriple::*;
+
+// One descriptor of one SMILES. A cached triple is reused, but a miss
+// computes only the requested descriptor, so the single-descriptor kernels
+// never pay for the other two. Only complete triples are cached: the NaN
+// triple of an invalid SMILES, never a partial one.
+double describe_one(std::string_view smiles, Descriptor descriptor) {
+    DescriptorTriple values;
+    if (descriptor_cache_lookup(smiles, values)) {
+        return values.*descriptor;
+    }
+    auto mol = smiles_to_mol(smiles);
+    if (!mol) {
+        values = compute_descriptors(nullptr);
+        descriptor_cache_insert(smiles, values);
+        return values.*descriptor;
+    }
+    if (descriptor == &DescriptorTriple::molecular_weight) {
+        return molecular_weight_of(*mol);
+    }
+    if (descriptor == &DescriptorTriple::logp) {
+        return logp_of(*mol);
+    }
+    return tpsa_of(*mol);
+}
+
+// Compute one descriptor per SMILES in parallel into out[0..n)
+void fill_descriptor(
+    const SmilesBatch& smiles_list,
+    double* out,
+    Descriptor descriptor
+) {
+    // RDKit work runs without holding the GIL
+    nb::gil_scoped_release release;
+    const QuietBatch quiet;
+    parallel_for(smiles_list.size(), [&](size_t i) {
+        out[i] = describe_one(smiles_list[i], descriptor);
+    });
+}
+
+// Compute one descriptor per SMILES into a new numpy array
+nb::ndarray<nb::numpy, double> calculate_descriptor(
+    const SmilesBatch& smiles_list,
+    Descriptor descriptor
+) {
     size_t size = smiles_list.size();
     
     // Allocate memory for result
-    double* data = new double[size];
-    
-    // Process each SMILES
-    for (size_t i = 0; i < size; ++i) {
-        auto mol = smiles_to_mol(smiles_list[i]);
-        if (mol) {
-            data[i] = RDKit::Descriptors::calcAMW(*mol);
-        } else {
-            data[i] = std::numeric_limits<double>::quiet_NaN();
-        }
-    }
+    std::unique_ptr<double[]> data(new double[size]);
+    fill_descriptor(smiles_list, data.get(), descriptor);
     
     // Create nanobind capsule for memory management
-    nb::capsule owner(data, [](void *p) noexcept {
+    nb::capsule owner(data.get(), [](void *p) noexcept {
         delete[] static_cast<double*>(p);
     });
     
     // Create nanobind ndarray
-    return nb::ndarray<nb::numpy, double>(data, {size}, owner);
+    return nb::ndarray<nb::numpy, double>(data.release(), {size}, owner);
+}
+
+// Compute one descriptor per SMILES into a caller-provided buffer
+void calculate_descriptor_into(
+    const SmilesBatch& smiles_list,
+    DoubleBuffer out,
+    Descriptor descriptor
+) {
+    check_rows(out.shape(0), smiles_list.size(), "out");
+    fill_descriptor(smiles_list, out.data(), descriptor);
 }
 
-nb::ndarray<nb::numpy, double> calculate_logp(const std::vector<std::string>& smiles_list) {
+nb::ndarray<nb::numpy, double> calculate_molecular_weights(const SmilesBatch& smiles_list) {
+    return calculate_descriptor(smiles_list, &DescriptorTriple::molecular_weight);
+}
+
+nb::ndarray<nb::numpy, double> calculate_logp(const SmilesBatch& smiles_list) {
+    return calculate_descriptor(smiles_list, &DescriptorTriple::logp);
+}
+
+nb::ndarray<nb::numpy, double> calculate_tpsa(const SmilesBatch& smiles_list) {
+    return calculate_descriptor(smiles_list, &DescriptorTriple::tpsa);
+}
+
+void calculate_molecular_weights_into(const SmilesBatch& smiles_list, DoubleBuffer out) {
+    calculate_descriptor_into(smiles_list, out, &DescriptorTriple::molecular_weight);
+}
+
+void calculate_logp_into(const SmilesBatch& smiles_list, DoubleBuffer out) {
+    calculate_descriptor_into(smiles_list, out, &DescriptorTriple::logp);
+}
+
+void calculate_tpsa_into(const SmilesBatch& smiles_list, DoubleBuffer out) {
+    calculate_descriptor_into(smiles_list, out, &DescriptorTriple::tpsa);
+}
+
+// Validate every SMILES in parallel into out[0..n)
+void fill_validity(const SmilesBatch& smiles_list, bool* out) {
+    nb::gil_scoped_release release;
+    const QuietBatch quiet;
+    parallel_for(smiles_list.size(), [&](size_t i) {
+        out[i] = (smiles_to_mol(smiles_list[i]) != nullptr);
+    });
+}
+
+nb::ndarray<nb::numpy, bool> validate_smiles(const SmilesBatch& smiles_list) {
     size_t size = smiles_list.size();
     
-    double* data = new double[size];
+    std::unique_ptr<bool[]> data(new bool[size]);
+    fill_validity(smiles_list, data.get());
     
+    nb::capsule owner(data.get(), [](void *p) noexcept {
+        delete[] static_cast<bool*>(p);
+    });
+    
+    return nb::ndarray<nb::numpy, bool>(data.release(), {size}, owner);
+}
+
+void validate_smiles_into(const SmilesBatch& smiles_list, BoolBuffer out) {
+    check_rows(out.shape(0), smiles_list.size(), "out");
+    fill_validity(smiles_list, out.data());
+}
+
+nb::ndarray<nb::numpy, uint64_t> validate_smiles_packed(const SmilesBatch& smiles_list) {
+    const size_t size = smiles_list.size();
+    const size_t words = (size + 63) / 64;
+
+    // Threads write whole bytes; packing afterwards keeps them off each
+    // other's words and costs one pass over n bytes
+    std::unique_ptr<bool[]> valid(new bool[std::max<size_t>(size, 1)]);
+    fill_validity(smiles_list, valid.get());
+
+    std::unique_ptr<uint64_t[]> data(new uint64_t[std::max<size_t>(words, 1)]());
     for (size_t i = 0; i < size; ++i) {
-        auto mol = smiles_to_mol(smiles_list[i]);
-        if (mol) {
-            data[i] = RDKit::Descriptors::calcClogP(*mol);
-        } else {
-            data[i] = std::numeric_limits<double>::quiet_NaN();
-        }
+        data[i / 64] |= static_cast<uint64_t>(valid[i]) << (i % 64);
     }
-    
-    nb::capsule owner(data, [](void *p) noexcept {
-        delete[] static_cast<double*>(p);
+
+    nb::capsule owner(data.get(), [](void* p) noexcept {
+        delete[] static_cast<uint64_t*>(p);
     });
-    
-    return nb::ndarray<nb::numpy, double>(data, {size}, owner);
+    return nb::ndarray<nb::numpy, uint64_t>(data.release(), {words}, owner);
 }
 
-nb::ndarray<nb::numpy, double> calculate_tpsa(const std::vector<std::string>& smiles_list) {
-    size_t size = smiles_list.size();
+// Descriptor rows of the (3, n) block: molecular weight, LogP, TPSA
+constexpr size_t kDescriptorRows = 3;
+constexpr size_t kCacheLineBytes = 64;
+
+// Parse each uncached SMILES once and write all descriptors in parallel
+void fill_descriptor_rows(
+    const SmilesBatch& smiles_list,
+    double* mw_data,
+    double* logp_data,
+    double* tpsa_data
+) {
+    nb::gil_scoped_release release;
+    const QuietBatch quiet;
+    parallel_for(smiles_list.size(), [&](size_t i) {
+        const DescriptorTriple values = describe_smiles(smiles_list[i]);
+        mw_data[i] = values.molecular_weight;
+        logp_data[i] = values.logp;
+        tpsa_data[i] = values.tpsa;
+    });
+}
+
+// Compute all descriptors into one C-contiguous (3, n) block starting on a
+// cache line, owned by the returned capsule
+nb::capsule calculate_descriptor_block(const SmilesBatch& smiles_list, double*& data) {
+    const size_t size = smiles_list.size();
+    // aligned_alloc needs a whole number of cache lines
+    const size_t bytes = kDescriptorRows * size * sizeof(double);
+    const size_t lines = std::max<size_t>((bytes + kCacheLineBytes - 1) / kCacheLineBytes, 1);
+    data = static_cast<double*>(std::aligned_alloc(kCacheLineBytes, lines * kCacheLineBytes));
+    if (!data) {
+        throw std::bad_alloc();
+    }
+    nb::capsule owner(data, [](void *p) noexcept { std::free(p); });
+
+    fill_descriptor_rows(smiles_list, data, data + size, data + 2 * size);
+    return owner;
+}
+
+nb::dict calculate_multiple_descriptors(const SmilesBatch& smiles_list) {
+    const size_t size = smiles_list.size();
+    double* data = nullptr;
+    nb::capsule owner = calculate_descriptor_block(smiles_list, data);
+
+    // Each array is a row view sharing the block's owner
+    nb::dict result;
+    result["molecular_weight"] = nb::ndarray<nb::numpy, double>(data, {size}, owner);
+    result["logp"] = nb::ndarray<nb::numpy, double>(data + size, {size}, owner);
+    result["tpsa"] = nb::ndarray<nb::numpy, double>(data + 2 * size, {size}, owner);
+
+    return result;
+}
+
+void calculate_multiple_descriptors_into(
+    const SmilesBatch& smiles_list,
+    DoubleBuffer mw_out,
+    DoubleBuffer logp_out,
+    DoubleBuffer tpsa_out
+) {
+    const size_t size = smiles_list.size();
+    check_rows(mw_out.shape(0), size, "mw_out");
+    check_rows(logp_out.shape(0), size, "logp_out");
+    check_rows(tpsa_out.shape(0), size, "tpsa_out");
+    fill_descriptor_rows(smiles_list, mw_out.data(), logp_out.data(), tpsa_out.data());
+}
+
+nb::ndarray<nb::numpy, double, nb::ndim<2>> calculate_descriptor_matrix(
+    const SmilesBatch& smiles_list
+) {
+    const size_t size = smiles_list.size();
+    double* data = nullptr;
+    nb::capsule owner = calculate_descriptor_block(smiles_list, data);
+
+    return nb::ndarray<nb::numpy, double, nb::ndim<2>>(data, {kDescriptorRows, size}, owner);
+}
+
+std::vector<std::string> canonicalize_smiles(const SmilesBatch& smiles_list) {
+    std::vector<std::string> result(smiles_list.size());
+    // Isomeric, non-Kekulé canonical SMILES (MolToSmiles' defaults), shared by
+    // every call instead of being rebuilt per molecule
+    static const RDKit::SmilesWriteParams write_params;
     
-    double* data = new double[size];
+    {
+        nb::gil_scoped_release release;
+        const QuietBatch quiet;
+        parallel_for(smiles_list.size(), [&](size_t i) {
+            auto mol = smiles_to_mol(smiles_list[i]);
+            if (mol) {
+                result[i] = RDKit::MolToSmiles(*mol, write_params);
+            }
+        });
+    }
     
+    return result;
+}
+
+nb::list canonicalize_smiles_bytes(const SmilesBatch& smiles_list) {
+    const std::vector<std::string> canonical = canonicalize_smiles(smiles_list);
+    nb::list result;
+    for (const std::string& smiles : canonical) {
+        result.append(nb::bytes(smiles.data(), smiles.size()));
+    }
+    return result;
+}
+
+nb::tuple canonicalize_smiles_buffer(const SmilesBatch& smiles_list) {
+    const std::vector<std::string> canonical = canonicalize_smiles(smiles_list);
+    const size_t size = canonical.size();
+    std::unique_ptr<int64_t[]> offsets(new int64_t[size + 1]);
+    offsets[0] = 0;
     for (size_t i = 0; i < size; ++i) {
-        auto mol = smiles_to_mol(smiles_list[i]);
-        if (mol) {
-            data[i] = RDKit::Descriptors::calcTPSA(*mol);
-        } else {
-            data[i] = std::numeric_limits<double>::quiet_NaN();
+        offsets[i + 1] = offsets[i] + static_cast<int64_t>(canonical[i].size());
+    }
+    const size_t total = static_cast<size_t>(offsets[size]);
+    std::unique_ptr<uint8_t[]> data(new uint8_t[std::max<size_t>(total, 1)]);
+    for (size_t i = 0; i < size; ++i) {
+        std::copy(canonical[i].begin(), canonical[i].end(), data.get() + offsets[i]);
+    }
+
+    nb::capsule data_owner(data.get(), [](void* p) noexcept {
+        delete[] static_cast<uint8_t*>(p);
+    });
+    nb::capsule offsets_owner(offsets.get(), [](void* p) noexcept {
+        delete[] static_cast<int64_t*>(p);
+    });
+    auto data_array = nb::ndarray<nb::numpy, uint8_t, nb::ndim<1>>(
+        data.release(), {total}, data_owner);
+    auto offsets_array = nb::ndarray<nb::numpy, int64_t, nb::ndim<1>>(
+        offsets.release(), {size + 1}, offsets_owner);
+    return nb::make_tuple(data_array, offsets_array);
+}
+
+nb::tuple deduplicate_smiles(const SmilesBatch& smiles_list) {
+    const size_t size = smiles_list.size();
+    std::unique_ptr<int64_t[]> inverse(new int64_t[std::max<size_t>(size, 1)]);
+    std::vector<int64_t> first;
+
+    {
+        nb::gil_scoped_release release;
+        std::unordered_map<std::string_view, int64_t> positions;
+        positions.reserve(size);
+        for (size_t i = 0; i < size; ++i) {
+            const auto [it, inserted] = positions.try_emplace(
+                smiles_list[i], static_cast<int64_t>(first.size()));
+            if (inserted) {
+                first.push_back(static_cast<int64_t>(i));
+            }
+            inverse[i] = it->second;
         }
     }
-    
-    nb::capsule owner(data, [](void *p) noexcept {
-        delete[] static_cast<double*>(p);
+
+    const size_t n_unique = first.size();
+    std::unique_ptr<int64_t[]> first_data(new int64_t[std::max<size_t>(n_unique, 1)]);
+    std::copy(first.begin(), first.end(), first_data.get());
+
+    nb::capsule first_owner(first_data.get(), [](void* p) noexcept {
+        delete[] static_cast<int64_t*>(p);
     });
-    
-    return nb::ndarray<nb::numpy, double>(data, {size}, owner);
+    nb::capsule inverse_owner(inverse.get(), [](void* p) noexcept {
+        delete[] static_cast<int64_t*>(p);
+    });
+    auto first_array = nb::ndarray<nb::numpy, int64_t, nb::ndim<1>>(
+        first_data.release(), {n_unique}, first_owner);
+    auto inverse_array = nb::ndarray<nb::numpy, int64_t, nb::ndim<1>>(
+        inverse.release(), {size}, inverse_owner);
+    return nb::make_tuple(first_array, inverse_array);
 }
 
-nb::ndarray<nb::numpy, bool> validate_smiles(const std::vector<std::string>& smiles_list) {
-    size_t size = smiles_list.size();
-    
-    bool* data = new bool[size];
-    
-    for (size_t i = 0; i < size; ++i) {
+// Fill an (n, nbits) fingerprint matrix in parallel
+void fill_morgan_fingerprints(
+    const SmilesBatch& smiles_list,
+    uint8_t* out,
+    int radius,
+    int nbits
+) {
+    nb::gil_scoped_release release;
+    const QuietBatch quiet;
+    parallel_for(smiles_list.size(), [&](size_t i) {
         auto mol = smiles_to_mol(smiles_list[i]);
-        data[i] = (mol != nullptr);
-    }
-    
-    nb::capsule owner(data, [](void *p) noexcept {
-        delete[] static_cast<bool*>(p);
+        write_fingerprint_row(mol.get(), radius, nbits, out + i * nbits);
     });
-    
-    return nb::ndarray<nb::numpy, bool>(data, {size}, owner);
 }
 
-nb::dict calculate_multiple_descriptors(const std::vector<std::string>& smiles_list) {
+nb::ndarray<nb::numpy, uint8_t> calculate_morgan_fingerprints(
+    const SmilesBatch& smiles_list,
+    int radius,
+    int nbits
+) {
     size_t size = smiles_list.size();
     
-    // Allocate memory for arrays
-    double* mw_data = new double[size];
-    double* logp_data = new double[size];
-    double* tpsa_data = new double[size];
+    // Allocate memory for 2D array (size x nbits)
+    std::unique_ptr<uint8_t[]> data(new uint8_t[size * nbits]);
+    fill_morgan_fingerprints(smiles_list, data.get(), radius, nbits);
     
-    // Process each SMILES once and calculate all descriptors
-    for (size_t i = 0; i < size; ++i) {
+    nb::capsule owner(data.get(), [](void *p) noexcept {
+        delete[] static_cast<uint8_t*>(p);
+    });
+    
+    // Create 2D nanobind ndarray
+    return nb::ndarray<nb::numpy, uint8_t>(data.release(), {size, static_cast<size_t>(nbits)}, owner);
+}
+
+void calculate_morgan_fingerprints_into(
+    const SmilesBatch& smiles_list,
+    FingerprintBuffer out,
+    int radius,
+    int nbits
+) {
+    check_rows(out.shape(0), smiles_list.size(), "out");
+    if (out.shape(1) != static_cast<size_t>(nbits)) {
+        throw std::invalid_argument("out must have nbits columns");
+    }
+    fill_morgan_fingerprints(smiles_list, out.data(), radius, nbits);
+}
+
+// Fill an (n, packed_words(nbits)) packed fingerprint matrix in parallel
+void fill_packed_morgan_fingerprints(
+    const SmilesBatch& smiles_list,
+    uint64_t* out,
+    int radius,
+    int nbits
+) {
+    const size_t words = packed_words(nbits);
+    const bool streaming =
+        smiles_list.size() * words * sizeof(uint64_t) > streaming_store_bytes();
+    nb::gil_scoped_release release;
+    const QuietBatch quiet;
+    parallel_for(smiles_list.size(), [&](size_t i) {
         auto mol = smiles_to_mol(smiles_list[i]);
-        if (mol) {
-            mw_data[i] = RDKit::Descriptors::calcAMW(*mol);
-            logp_data[i] = RDKit::Descriptors::calcClogP(*mol);
-            tpsa_data[i] = RDKit::Descriptors::calcTPSA(*mol);
+        if (streaming) {
+            stream_packed_fingerprint_row(mol.get(), radius, nbits, out + i * words);
         } else {
-            mw_data[i] = std::numeric_limits<double>::quiet_NaN();
-            logp_data[i] = std::numeric_limits<double>::quiet_NaN();
-            tpsa_data[i] = std::numeric_limits<double>::quiet_NaN();
+            write_packed_fingerprint_row(mol.get(), radius, nbits, out + i * words);
         }
-    }
-    
-    // Create capsules for memory management
-    nb::capsule mw_owner(mw_data, [](void *p) noexcept { delete[] static_cast<double*>(p); });
-    nb::capsule logp_owner(logp_data, [](void *p) noexcept { delete[] static_cast<double*>(p); });
-    nb::capsule tpsa_owner(tpsa_data, [](void *p) noexcept { delete[] static_cast<double*>(p); });
+    }, kDefaultChunkSize, [streaming] {
+        if (streaming) stream_fence();
+    });
+}
+
+nb::ndarray<nb::numpy, uint64_t> calculate_morgan_fingerprints_packed(
+    const SmilesBatch& smiles_list,
+    int radius,
+    int nbits
+) {
+    size_t size = smiles_list.size();
+    size_t words = packed_words(nbits);
     
-    // Create arrays
-    auto mw_result = nb::ndarray<nb::numpy, double>(mw_data, {size}, mw_owner);
-    auto logp_result = nb::ndarray<nb::numpy, double>(logp_data, {size}, logp_owner);
-    auto tpsa_result = nb::ndarray<nb::numpy, double>(tpsa_data, {size}, tpsa_owner);
+    std::unique_ptr<uint64_t[]> data(new uint64_t[size * words]);
+    fill_packed_morgan_fingerprints(smiles_list, data.get(), radius, nbits);
     
-    nb::dict result;
-    result["molecular_weight"] = mw_result;
-    result["logp"] = logp_result;
-    result["tpsa"] = tpsa_result;
+    nb::capsule owner(data.get(), [](void *p) noexcept {
+        delete[] static_cast<uint64_t*>(p);
+    });
     
-    return result;
+    return nb::ndarray<nb::numpy, uint64_t>(data.release(), {size, words}, owner);
 }
 
-std::vector<std::string> canonicalize_smiles(const std::vector<std::string>& smiles_list) {
-    std::vector<std::string> result;
-    result.reserve(smiles_list.size());
-    
-    for (const auto& smiles : smiles_list) {
-        auto mol = smiles_to_mol(smiles);
-        if (mol) {
-            result.push_back(RDKit::MolToSmiles(*mol));
-        } else {
-            result.push_back("");
+void calculate_morgan_fingerprints_packed_into(
+    const SmilesBatch& smiles_list,
+    PackedFingerprintBuffer out,
+    int radius,
+    int nbits
+) {
+    check_rows(out.shape(0), smiles_list.size(), "out");
+    if (out.shape(1) != packed_words(nbits)) {
+        throw std::invalid_argument("out must have ceil(nbits / 64) columns");
+    }
+    fill_packed_morgan_fingerprints(smiles_list, out.data(), radius, nbits);
+}
+
+// Positions of the set bits of one fingerprint; invalid molecules and
+// failures have none
+std::vector<int32_t> fingerprint_bit_positions(const RDKit::ROMol* mol, int radius, int nbits) {
+    std::vector<int32_t> positions;
+    if (!mol) {
+        return positions;
+    }
+    try {
+        std::unique_ptr<ExplicitBitVect> fp(
+            RDKit::MorganFingerprints::getFingerprintAsBitVect(*mol, radius, nbits));
+        const auto& bits = *fp->dp_bits;
+        positions.reserve(bits.count());
+        for (auto bit = bits.find_first(); bit != bits.npos; bit = bits.find_next(bit)) {
+            positions.push_back(static_cast<int32_t>(bit));
         }
+    } catch (const std::exception& e) {
+        positions.clear();
     }
-    
-    return result;
+    return positions;
 }
 
-nb::ndarray<nb::numpy, uint8_t> calculate_morgan_fingerprints(
-    const std::vector<std::string>& smiles_list,
+nb::tuple calculate_morgan_fingerprints_sparse(
+    const SmilesBatch& smiles_list,
     int radius,
     int nbits
 ) {
-    size_t size = smiles_list.size();
-    
-    // Allocate memory for 2D array (size x nbits)
-    uint8_t* data = new uint8_t[size * nbits];
-    
-    for (size_t i = 0; i < size; ++i) {
-        auto mol = smiles_to_mol(smiles_list[i]);
-        if (mol) {
-            try {
-                auto fp = RDKit::MorganFingerprints::getFingerprintAsBitVect(*mol, radius, nbits);
-                
-                // Copy bits to result array
-                for (int j = 0; j < nbits; ++j) {
-                    data[i * nbits + j] = fp->getBit(j) ? 1 : 0;
-                }
-            } catch (const std::exception& e) {
-                // On error, set all bits to 0
-                for (int j = 0; j < nbits; ++j) {
-                    data[i * nbits + j] = 0;
-                }
-            }
-        } else {
-            // Invalid SMILES, set all bits to 0
-            for (int j = 0; j < nbits; ++j) {
-                data[i * nbits + j] = 0;
-            }
+    const size_t size = smiles_list.size();
+    std::unique_ptr<int64_t[]> indptr(new int64_t[size + 1]);
+    std::unique_ptr<int32_t[]> indices;
+    size_t nnz = 0;
+
+    {
+        nb::gil_scoped_release release;
+        const QuietBatch quiet;
+        // Rows are computed independently, then concatenated once their
+        // lengths, and so their offsets, are known
+        std::vector<std::vector<int32_t>> rows(size);
+        parallel_for(size, [&](size_t i) {
+            auto mol = smiles_to_mol(smiles_list[i]);
+            rows[i] = fingerprint_bit_positions(mol.get(), radius, nbits);
+        });
+
+        indptr[0] = 0;
+        for (size_t i = 0; i < size; ++i) {
+            indptr[i + 1] = indptr[i] + static_cast<int64_t>(rows[i].size());
         }
+        nnz = static_cast<size_t>(indptr[size]);
+        indices.reset(new int32_t[std::max<size_t>(nnz, 1)]);
+
+        int32_t* out = indices.get();
+        const int64_t* offsets = indptr.get();
+        parallel_for(size, [&](size_t i) {
+            std::copy(rows[i].begin(), rows[i].end(), out + offsets[i]);
+        });
     }
-    
-    nb::capsule owner(data, [](void *p) noexcept {
-        delete[] static_cast<uint8_t*>(p);
+
+    nb::capsule indptr_owner(indptr.get(), [](void *p) noexcept {
+        delete[] static_cast<int64_t*>(p);
+    });
+    nb::capsule indices_owner(indices.get(), [](void *p) noexcept {
+        delete[] static_cast<int32_t*>(p);
+    });
+    auto indptr_array = nb::ndarray<nb::numpy, int64_t>(indptr.release(), {size + 1}, indptr_owner);
+    auto indices_array = nb::ndarray<nb::numpy, int32_t>(indices.release(), {nnz}, indices_owner);
+    return nb::make_tuple(indptr_array, indices_array);
+}
+
+void batch_all(
+    const SmilesBatch& smiles_list,
+    BoolBuffer valid_out,
+    std::optional<DoubleBuffer> mw_out,
+    std::optional<DoubleBuffer> logp_out,
+    std::optional<DoubleBuffer> tpsa_out,
+    std::optional<FingerprintBuffer> fp_out,
+    std::optional<PackedFingerprintBuffer> packed_fp_out,
+    int radius,
+    int nbits,
+    size_t chunk_size
+) {
+    const size_t size = smiles_list.size();
+
+    check_rows(valid_out.shape(0), size, "valid_out");
+    if (mw_out) check_rows(mw_out->shape(0), size, "mw_out");
+    if (logp_out) check_rows(logp_out->shape(0), size, "logp_out");
+    if (tpsa_out) check_rows(tpsa_out->shape(0), size, "tpsa_out");
+    if (fp_out) {
+        check_rows(fp_out->shape(0), size, "fp_out");
+        if (fp_out->shape(1) != static_cast<size_t>(nbits)) {
+            throw std::invalid_argument("fp_out must have nbits columns");
+        }
+    }
+    if (packed_fp_out) {
+        check_rows(packed_fp_out->shape(0), size, "packed_fp_out");
+        if (packed_fp_out->shape(1) != packed_words(nbits)) {
+            throw std::invalid_argument("packed_fp_out must have ceil(nbits / 64) columns");
+        }
+    }
+
+    bool* valid = valid_out.data();
+    double* mw = mw_out ? mw_out->data() : nullptr;
+    double* logp = logp_out ? logp_out->data() : nullptr;
+    double* tpsa = tpsa_out ? tpsa_out->data() : nullptr;
+    uint8_t* fps = fp_out ? fp_out->data() : nullptr;
+    uint64_t* packed_fps = packed_fp_out ? packed_fp_out->data() : nullptr;
+    const size_t words = packed_words(nbits);
+    const bool streaming = packed_fps && size * words * sizeof(uint64_t) > streaming_store_bytes();
+
+    // Parse each SMILES once and derive every requested output from it;
+    // every thread writes only to its own rows of the output buffers
+    nb::gil_scoped_release release;
+    const QuietBatch quiet;
+    const bool any_descriptors = mw || logp || tpsa;
+    parallel_for(size, [&](size_t i) {
+        if (!fps && !packed_fps && any_descriptors) {
+            // Descriptors alone can come from the cache; invalid SMILES are
+            // cached with NaN descriptors
+            const DescriptorTriple values = describe_smiles(smiles_list[i]);
+            valid[i] = !std::isnan(values.molecular_weight);
+            if (mw) mw[i] = values.molecular_weight;
+            if (logp) logp[i] = values.logp;
+            if (tpsa) tpsa[i] = values.tpsa;
+            return;
+        }
+        // Fingerprints need the molecule anyway; descriptors still come from
+        // the cache when another call already computed them
+        auto mol = smiles_to_mol(smiles_list[i]);
+        valid[i] = (mol != nullptr);
+        if (any_descriptors) {
+            const DescriptorTriple values = describe_parsed(smiles_list[i], mol.get());
+            if (mw) mw[i] = values.molecular_weight;
+            if (logp) logp[i] = values.logp;
+            if (tpsa) tpsa[i] = values.tpsa;
+        }
+        if (fps) write_fingerprint_row(mol.get(), radius, nbits, fps + i * nbits);
+        if (streaming) {
+            stream_packed_fingerprint_row(mol.get(), radius, nbits, packed_fps + i * words);
+        } else if (packed_fps) {
+            write_packed_fingerprint_row(mol.get(), radius, nbits, packed_fps + i * words);
+        }
+    }, chunk_size, [streaming] {
+        if (streaming) stream_fence();
     });
-    
-    // Create 2D nanobind ndarray
-    return nb::ndarray<nb::numpy, uint8_t>(data, {size, static_cast<size_t>(nbits)}, owner);
 }
 
 nb::tuple ecfp_reasoning_trace(const std::string& smiles,
@@ -217,28 +835,35 @@ nb::tuple ecfp_reasoning_trace(const std::string& smiles,
                                bool isomeric,
                                bool kekulize,
                                bool include_per_center,
-                               int fingerprint_size) {
+                               int fingerprint_size,
+                               bool as_bytes) {
     const unsigned int fp_radius =
         radius < 0 ? 0U : static_cast<unsigned int>(radius);
     const std::size_t fp_bits =
         fingerprint_size <= 0
             ? kECFPReasoningFingerprintSize
             : static_cast<std::size_t>(fingerprint_size);
-    auto trace_result = ecfp_reasoning_trace_from_smiles(
-        smiles, fp_radius, isomeric, kekulize, include_per_center, fp_bits);
-    std::string trace = std::move(std::get<0>(trace_result));
-    std::vector<std::uint8_t> fingerprint =
-        std::move(std::get<1>(trace_result));
-
-    const std::size_t fp_size = fingerprint.size();
-    uint8_t* data = new uint8_t[fp_size];
-    std::copy(fingerprint.begin(), fingerprint.end(), data);
-    nb::capsule owner(data, [](void* p) noexcept {
+    // The fingerprint is written straight into the returned array, which
+    // always holds exactly fp_bits elements
+    std::unique_ptr<uint8_t[]> data(new uint8_t[fp_bits]);
+    std::string trace;
+    {
+        nb::gil_scoped_release release;
+        trace = ecfp_reasoning_trace_into(
+            smiles, fp_radius, isomeric, kekulize, include_per_center,
+            data.get(), fp_bits);
+    }
+
+    nb::capsule owner(data.get(), [](void* p) noexcept {
         delete[] static_cast<uint8_t*>(p);
     });
     auto fingerprint_array =
-        nb::ndarray<nb::numpy, uint8_t>(data, {fp_size}, owner);
+        nb::ndarray<nb::numpy, uint8_t>(data.release(), {fp_bits}, owner);
 
+    if (as_bytes) {
+        return nb::make_tuple(nb::bytes(trace.data(), trace.size()),
+                              std::move(fingerprint_array));
+    }
     return nb::make_tuple(std::move(trace), std::move(fingerprint_array));
 }
 
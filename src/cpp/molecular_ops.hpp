@@ -1,6 +1,8 @@
 #pragma once
 
 #include "ecfp_trace.hpp"
+#include "parallel.hpp"
+#include "smiles_batch.hpp"
 #include <GraphMol/GraphMol.h>
 #include <GraphMol/SmilesParse/SmilesParse.h>
 #include <GraphMol/Descriptors/MolDescriptors.h>
@@ -8,21 +10,40 @@
 #include <GraphMol/MolPickler.h>
 #include <nanobind/nanobind.h>
 #include <nanobind/ndarray.h>
+#include <nanobind/stl/optional.h>
 #include <nanobind/stl/string.h>
 #include <nanobind/stl/vector.h>
 #include <memory>
+#include <optional>
 #include <string>
 #include <vector>
 
 namespace rdktools {
 
+// Writable, caller-owned numpy buffers used by the in-place batch kernels
+using BoolBuffer = nanobind::ndarray<
+    bool, nanobind::ndim<1>, nanobind::c_contig, nanobind::device::cpu>;
+using DoubleBuffer = nanobind::ndarray<
+    double, nanobind::ndim<1>, nanobind::c_contig, nanobind::device::cpu>;
+using FingerprintBuffer = nanobind::ndarray<
+    uint8_t, nanobind::ndim<2>, nanobind::c_contig, nanobind::device::cpu>;
+using PackedFingerprintBuffer = nanobind::ndarray<
+    uint64_t, nanobind::ndim<2>, nanobind::c_contig, nanobind::device::cpu>;
+
+/**
+ * @brief Number of 64-bit words needed to hold a packed nbits fingerprint
+ */
+inline size_t packed_words(int nbits) {
+    return (static_cast<size_t>(nbits) + 63) / 64;
+}
+
 /**
  * @brief Process SMILES strings from list and return molecular weights
  * @param smiles_list list of SMILES strings
  * @return numpy array of molecular weights
  */
 nanobind::ndarray<nanobind::numpy, double> calculate_molecular_weights(
-    const std::vector<std::string>& smiles_list
+    const SmilesBatch& smiles_list
 );
 
 /**
@@ -31,7 +52,7 @@ nanobind::ndarray<nanobind::numpy, double> calculate_molecular_weights(
  * @return numpy array of LogP values
  */
 nanobind::ndarray<nanobind::numpy, double> calculate_logp(
-    const std::vector<std::string>& smiles_list
+    const SmilesBatch& smiles_list
 );
 
 /**
@@ -40,7 +61,37 @@ nanobind::ndarray<nanobind::numpy, double> calculate_logp(
  * @return numpy array of TPSA values
  */
 nanobind::ndarray<nanobind::numpy, double> calculate_tpsa(
-    const std::vector<std::string>& smiles_list
+    const SmilesBatch& smiles_list
+);
+
+/**
+ * @brief Calculate molecular weights into a caller-provided buffer
+ * @param smiles_list list of SMILES strings
+ * @param out float64 buffer with one element per SMILES string
+ */
+void calculate_molecular_weights_into(
+    const SmilesBatch& smiles_list,
+    DoubleBuffer out
+);
+
+/**
+ * @brief Calculate LogP values into a caller-provided buffer
+ * @param smiles_list list of SMILES strings
+ * @param out float64 buffer with one element per SMILES string
+ */
+void calculate_logp_into(
+    const SmilesBatch& smiles_list,
+    DoubleBuffer out
+);
+
+/**
+ * @brief Calculate TPSA values into a caller-provided buffer
+ * @param smiles_list list of SMILES strings
+ * @param out float64 buffer with one element per SMILES string
+ */
+void calculate_tpsa_into(
+    const SmilesBatch& smiles_list,
+    DoubleBuffer out
 );
 
 /**
@@ -49,7 +100,24 @@ nanobind::ndarray<nanobind::numpy, double> calculate_tpsa(
  * @return numpy array of boolean values (true for valid SMILES)
  */
 nanobind::ndarray<nanobind::numpy, bool> validate_smiles(
-    const std::vector<std::string>& smiles_list
+    const SmilesBatch& smiles_list
+);
+
+/**
+ * @brief Validate SMILES strings into a caller-provided buffer
+ * @param smiles_list list of SMILES strings
+ * @param out writable boolean array with one element per SMILES string
+ */
+void validate_smiles_into(const SmilesBatch& smiles_list, BoolBuffer out);
+
+/**
+ * @brief Validate SMILES strings into a bit-packed mask
+ * @param smiles_list list of SMILES strings
+ * @return uint64 array of ceil(n / 64) words; SMILES i is valid when bit
+ *         i % 64 of word i / 64 is set (the packed fingerprint layout)
+ */
+nanobind::ndarray<nanobind::numpy, uint64_t> validate_smiles_packed(
+    const SmilesBatch& smiles_list
 );
 
 /**
@@ -58,7 +126,40 @@ nanobind::ndarray<nanobind::numpy, bool> validate_smiles(
  * @return dictionary with arrays of molecular weights, LogP, and TPSA
  */
 nanobind::dict calculate_multiple_descriptors(
-    const std::vector<std::string>& smiles_list
+    const SmilesBatch& smiles_list
+);
+
+/**
+ * @brief Calculate multiple descriptors into caller-provided buffers
+ *
+ * Each buffer may be a view (e.g. a slice of a larger result array), so the
+ * values land in their final location without an intermediate copy.
+ *
+ * @param smiles_list list of SMILES strings
+ * @param mw_out buffer receiving molecular weights
+ * @param logp_out buffer receiving LogP values
+ * @param tpsa_out buffer receiving TPSA values
+ */
+void calculate_multiple_descriptors_into(
+    const SmilesBatch& smiles_list,
+    DoubleBuffer mw_out,
+    DoubleBuffer logp_out,
+    DoubleBuffer tpsa_out
+);
+
+/**
+ * @brief Calculate multiple descriptors into a single (3, n) array
+ *
+ * Rows hold molecular weights, LogP and TPSA values. The block is
+ * C-contiguous and starts on a 64-byte cache line, so one vector sweep covers
+ * every descriptor; calculate_multiple_descriptors returns the same rows as
+ * separate arrays.
+ *
+ * @param smiles_list list of SMILES strings
+ * @return (3, n) float64 numpy array; invalid SMILES have NaN columns
+ */
+nanobind::ndarray<nanobind::numpy, double, nanobind::ndim<2>> calculate_descriptor_matrix(
+    const SmilesBatch& smiles_list
 );
 
 /**
@@ -67,9 +168,47 @@ nanobind::dict calculate_multiple_descriptors(
  * @return list of canonical SMILES strings
  */
 std::vector<std::string> canonicalize_smiles(
-    const std::vector<std::string>& smiles_list
+    const SmilesBatch& smiles_list
+);
+
+/**
+ * @brief Convert SMILES to canonical form as UTF-8 bytes objects
+ *
+ * Same result as canonicalize_smiles without decoding every SMILES into a
+ * Python str.
+ *
+ * @param smiles_list list of SMILES strings
+ * @return list of canonical SMILES bytes (empty bytes for invalid SMILES)
+ */
+nanobind::list canonicalize_smiles_bytes(
+    const SmilesBatch& smiles_list
 );
 
+/**
+ * @brief Canonicalize SMILES into one contiguous UTF-8 buffer
+ *
+ * Canonical SMILES are written back to back, in the layout of Arrow's
+ * large_string arrays, so no Python string object is created per molecule.
+ *
+ * @param smiles_list list of SMILES strings
+ * @return tuple of a uint8 array of UTF-8 bytes and an int64 array of n + 1
+ *         offsets; SMILES i is bytes[offsets[i]:offsets[i + 1]], empty for
+ *         invalid SMILES
+ */
+nanobind::tuple canonicalize_smiles_buffer(const SmilesBatch& smiles_list);
+
+/**
+ * @brief Find the distinct SMILES strings of a batch by hashing
+ *
+ * Strings are compared byte for byte, in one pass over the batch.
+ *
+ * @param smiles_list list of SMILES strings
+ * @return tuple of int64 arrays: the index of the first occurrence of each
+ *         distinct string, in input order, and for every input the position
+ *         of its string among the distinct ones
+ */
+nanobind::tuple deduplicate_smiles(const SmilesBatch& smiles_list);
+
 /**
  * @brief Calculate Morgan fingerprints as bit vectors
  * @param smiles_list list of SMILES strings
@@ -78,11 +217,108 @@ std::vector<std::string> canonicalize_smiles(
  * @return 2D numpy array where each row is a fingerprint bit vector
  */
 nanobind::ndarray<nanobind::numpy, uint8_t> calculate_morgan_fingerprints(
-    const std::vector<std::string>& smiles_list,
+    const SmilesBatch& smiles_list,
+    int radius = 2,
+    int nbits = 2048
+);
+
+/**
+ * @brief Calculate Morgan fingerprints into a caller-provided buffer
+ * @param smiles_list list of SMILES strings
+ * @param out (n, nbits) uint8 buffer receiving one fingerprint per row
+ * @param radius fingerprint radius (default: 2)
+ * @param nbits number of bits in fingerprint (default: 2048)
+ */
+void calculate_morgan_fingerprints_into(
+    const SmilesBatch& smiles_list,
+    FingerprintBuffer out,
     int radius = 2,
     int nbits = 2048
 );
 
+/**
+ * @brief Calculate bit-packed Morgan fingerprints
+ *
+ * Bit j of a fingerprint is stored in word j / 64 at bit position j % 64,
+ * so each row occupies ceil(nbits / 64) uint64 words instead of nbits bytes.
+ *
+ * @param smiles_list list of SMILES strings
+ * @param radius fingerprint radius (default: 2)
+ * @param nbits number of bits in fingerprint (default: 2048)
+ * @return 2D uint64 numpy array of shape (n, ceil(nbits / 64))
+ */
+nanobind::ndarray<nanobind::numpy, uint64_t> calculate_morgan_fingerprints_packed(
+    const SmilesBatch& smiles_list,
+    int radius = 2,
+    int nbits = 2048
+);
+
+/**
+ * @brief Calculate bit-packed Morgan fingerprints into a caller-provided buffer
+ * @param smiles_list list of SMILES strings
+ * @param out (n, ceil(nbits / 64)) uint64 buffer receiving one fingerprint per row
+ * @param radius fingerprint radius (default: 2)
+ * @param nbits number of bits in fingerprint (default: 2048)
+ */
+void calculate_morgan_fingerprints_packed_into(
+    const SmilesBatch& smiles_list,
+    PackedFingerprintBuffer out,
+    int radius = 2,
+    int nbits = 2048
+);
+
+/**
+ * @brief Calculate Morgan fingerprints as compressed sparse rows
+ *
+ * Only the set bits are stored, which suits long or low-density
+ * fingerprints. The set bits of row i are indices[indptr[i]:indptr[i + 1]],
+ * in ascending order.
+ *
+ * @param smiles_list list of SMILES strings
+ * @param radius fingerprint radius (default: 2)
+ * @param nbits number of bits in fingerprint (default: 2048)
+ * @return tuple of (n + 1,) int64 row offsets and int32 bit positions;
+ *         invalid SMILES have empty rows
+ */
+nanobind::tuple calculate_morgan_fingerprints_sparse(
+    const SmilesBatch& smiles_list,
+    int radius = 2,
+    int nbits = 2048
+);
+
+/**
+ * @brief Validate, describe and fingerprint SMILES with a single parse each
+ *
+ * Results are written into the caller-provided buffers, which must have one
+ * row per SMILES string. Descriptor and fingerprint buffers are optional;
+ * passing None skips that part of the computation.
+ *
+ * @param smiles_list list of SMILES strings
+ * @param valid_out boolean buffer receiving SMILES validity
+ * @param mw_out optional buffer receiving molecular weights
+ * @param logp_out optional buffer receiving LogP values
+ * @param tpsa_out optional buffer receiving TPSA values
+ * @param fp_out optional (n, nbits) buffer receiving Morgan fingerprints
+ * @param packed_fp_out optional (n, ceil(nbits / 64)) buffer receiving
+ *        bit-packed Morgan fingerprints
+ * @param radius fingerprint radius (default: 2)
+ * @param nbits number of bits in fingerprint (default: 2048)
+ * @param chunk_size molecules handed to a thread at a time; a hint that is
+ *        shrunk to keep every thread busy (default: 64)
+ */
+void batch_all(
+    const SmilesBatch& smiles_list,
+    BoolBuffer valid_out,
+    std::optional<DoubleBuffer> mw_out,
+    std::optional<DoubleBuffer> logp_out,
+    std::optional<DoubleBuffer> tpsa_out,
+    std::optional<FingerprintBuffer> fp_out,
+    std::optional<PackedFingerprintBuffer> packed_fp_out,
+    int radius = 2,
+    int nbits = 2048,
+    size_t chunk_size = kDefaultChunkSize
+);
+
 /**
  * @brief Generate an ECFP-style reasoning trace for a SMILES string.
  * @param smiles SMILES string to analyse
@@ -91,7 +327,10 @@ nanobind::ndarray<nanobind::numpy, uint8_t> calculate_morgan_fingerprints(
  * @param kekulize Whether to kekulize the molecule before generating fragments
  * @param include_per_center Whether to include per-atom chains in the trace
  * @param fingerprint_size Desired fingerprint length in bits (default: 2048)
- * @return Multi-line reasoning trace text. Invalid SMILES yield an empty string.
+ * @param as_bytes Return the trace as UTF-8 bytes instead of str
+ * @return Tuple of the multi-line reasoning trace text and a uint8 array of
+ *         exactly fingerprint_size bits. Invalid SMILES yield an empty trace
+ *         and a zeroed fingerprint.
  */
 nanobind::tuple ecfp_reasoning_trace(
     const std::string& smiles,
@@ -100,7 +339,8 @@ nanobind::tuple ecfp_reasoning_trace(
     bool kekulize = false,
     bool include_per_center = true,
     int fingerprint_size =
-        static_cast<int>(kECFPReasoningFingerprintSize)
+        static_cast<int>(kECFPReasoningFingerprintSize),
+    bool as_bytes = false
 );
 
 } // namespace rdktools
@@ -0,0 +1,44 @@
+#include "parallel.hpp"
+#include <atomic>
+#include <cstdlib>
+#include <string>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+namespace rdktools {
+
+namespace {
+
+// 0 means "use the OpenMP default" (typically one thread per core)
+std::atomic<int> g_num_threads{0};
+
+} // namespace
+
+void set_num_threads(int num_threads) {
+    g_num_threads.store(num_threads > 0 ? num_threads : 0);
+}
+
+int get_num_threads() {
+#ifdef _OPENMP
+    const int configured = g_num_threads.load();
+    return configured > 0 ? configured : omp_get_max_threads();
+#else
+    return 1;
+#endif
+}
+
+void configure_threads_from_env() {
+    const char* value = std::getenv("RDKTOOLS_NUM_THREADS");
+    if (value == nullptr || *value == '\0') {
+        return;
+    }
+    try {
+        set_num_threads(std::stoi(value));
+    } catch (const std::exception&) {
+        // Ignore malformed values and keep the default
+    }
+}
+
+} // namespace rdktools
@@ -0,0 +1,87 @@
+#pragma once
+
+#include <algorithm>
+#include <cstddef>
+#include <exception>
+#include <mutex>
+#include <utility>
+
+namespace rdktools {
+
+/**
+ * @brief Set the number of threads used by the batch kernels
+ * @param num_threads thread count; values below 1 restore the default
+ */
+void set_num_threads(int num_threads);
+
+/**
+ * @brief Number of threads the batch kernels will use
+ * @return configured thread count (1 when built without OpenMP)
+ */
+int get_num_threads();
+
+/**
+ * @brief Read RDKTOOLS_NUM_THREADS from the environment, if set
+ */
+void configure_threads_from_env();
+
+/// Default number of iterations handed to a thread at a time
+constexpr std::size_t kDefaultChunkSize = 64;
+
+/**
+ * @brief Run fn(i) for i in [0, size) across the configured threads
+ *
+ * Molecules vary wildly in parse cost, so iterations are handed out
+ * dynamically in chunks of chunk_size. The chunk is treated as a hint and
+ * shrunk when it would leave threads without several chunks each; loops no
+ * longer than the default chunk run serially. Every thread that took part
+ * calls done() once, after its last iteration and before leaving the
+ * parallel region; done must not throw. The first exception raised by fn is
+ * rethrown on the calling thread once the loop has finished.
+ */
+template <typename Fn, typename Done>
+void parallel_for(std::size_t size, Fn&& fn, std::size_t chunk_size, Done&& done) {
+    const auto n = static_cast<std::ptrdiff_t>(size);
+    std::exception_ptr error;
+    std::mutex error_mutex;
+    [[maybe_unused]] const int num_threads = get_num_threads();
+    [[maybe_unused]] const int chunk = static_cast<int>(std::max<std::size_t>(
+        1, std::min(chunk_size, size / (4 * static_cast<std::size_t>(num_threads)))));
+
+#ifdef _OPENMP
+    #pragma omp parallel num_threads(num_threads) if(size > kDefaultChunkSize)
+#endif
+    {
+#ifdef _OPENMP
+        #pragma omp for schedule(dynamic, chunk) nowait
+#endif
+        for (std::ptrdiff_t i = 0; i < n; ++i) {
+            try {
+                fn(static_cast<std::size_t>(i));
+            } catch (...) {
+                std::lock_guard<std::mutex> guard(error_mutex);
+                if (!error) {
+                    error = std::current_exception();
+                }
+            }
+        }
+        done();
+    }
+
+    if (error) {
+        std::rethrow_exception(error);
+    }
+}
+
+/**
+ * @brief Run fn(i) for i in [0, size) across the configured threads
+ *
+ * Same scheduling and exception handling as the overload above, without a
+ * per-thread epilogue.
+ */
+template <typename Fn>
+void parallel_for(std::size_t size, Fn&& fn, std::size_t chunk_size = kDefaultChunkSize) {
+    parallel_for(size, std::forward<Fn>(fn), chunk_size, [] {});
+}
+
+} // namespace rdktools
@@ -1,8 +1,12 @@
 #include <nanobind/nanobind.h>
 #include <nanobind/ndarray.h>
+#include <nanobind/stl/optional.h>
 #include <nanobind/stl/vector.h>
 #include <nanobind/stl/string.h>
+#include "descriptor_cache.hpp"
 #include "molecular_ops.hpp"
+#include "parallel.hpp"
+#include "similarity.hpp"
  
 // Helper macros to stringify VERSION_INFO passed from CMake
 #ifndef STRINGIFY
@@ -18,6 +22,23 @@ using namespace nb::literals;
 NB_MODULE(_rdktools_core, m) {
     m.doc() = "High-performance molecular operations using RDKit C++";
     
+    // Thread count for the parallel batch kernels (RDKTOOLS_NUM_THREADS)
+    rdktools::configure_threads_from_env();
+    m.def("set_num_threads", &rdktools::set_num_threads,
+          "Set the number of threads used by batch kernels (<1 restores the default)",
+          "num_threads"_a);
+    m.def("get_num_threads", &rdktools::get_num_threads,
+          "Number of threads used by batch kernels");
+    
+    // Descriptor cache shared by the descriptor kernels
+    m.def("set_cache_size", &rdktools::set_descriptor_cache_size,
+          "Set the maximum number of SMILES in the descriptor cache (0 disables it)",
+          "capacity"_a);
+    m.def("get_cache_size", &rdktools::get_descriptor_cache_size,
+          "Maximum number of SMILES in the descriptor cache");
+    m.def("clear_cache", &rdktools::clear_descriptor_cache,
+          "Drop every cached descriptor");
+    
     // Molecular weight calculation
     m.def("calculate_molecular_weights", &rdktools::calculate_molecular_weights,
           "Calculate molecular weights for SMILES strings",
@@ -33,20 +54,57 @@ NB_MODULE(_rdktools_core, m) {
           "Calculate TPSA values for SMILES strings",
           "smiles_list"_a);
     
+    // In-place variants writing into caller-provided float64 buffers
+    m.def("calculate_molecular_weights_into", &rdktools::calculate_molecular_weights_into,
+          "Calculate molecular weights into a preallocated array",
+          "smiles_list"_a, "out"_a.noconvert());
+    m.def("calculate_logp_into", &rdktools::calculate_logp_into,
+          "Calculate LogP values into a preallocated array",
+          "smiles_list"_a, "out"_a.noconvert());
+    m.def("calculate_tpsa_into", &rdktools::calculate_tpsa_into,
+          "Calculate TPSA values into a preallocated array",
+          "smiles_list"_a, "out"_a.noconvert());
+    
     // SMILES validation
     m.def("validate_smiles", &rdktools::validate_smiles,
           "Validate SMILES strings and return boolean array",
           "smiles_list"_a);
+    m.def("validate_smiles_into", &rdktools::validate_smiles_into,
+          "Validate SMILES strings into a preallocated boolean array",
+          "smiles_list"_a, "out"_a.noconvert());
+    m.def("validate_smiles_packed", &rdktools::validate_smiles_packed,
+          "Validate SMILES strings into a mask of one bit per SMILES in uint64 words",
+          "smiles_list"_a);
     
     // Multiple descriptors calculation
     m.def("calculate_multiple_descriptors", &rdktools::calculate_multiple_descriptors,
           "Calculate multiple descriptors efficiently for SMILES strings",
           "smiles_list"_a);
+    m.def("calculate_multiple_descriptors_into", &rdktools::calculate_multiple_descriptors_into,
+          "Calculate molecular weight, LogP and TPSA into preallocated arrays",
+          "smiles_list"_a,
+          "mw_out"_a.noconvert(),
+          "logp_out"_a.noconvert(),
+          "tpsa_out"_a.noconvert());
+    m.def("calculate_descriptor_matrix", &rdktools::calculate_descriptor_matrix,
+          "Calculate molecular weight, LogP and TPSA rows of a (3, n) array",
+          "smiles_list"_a);
     
     // SMILES canonicalization
     m.def("canonicalize_smiles", &rdktools::canonicalize_smiles,
           "Convert SMILES to canonical form",
           "smiles_list"_a);
+    m.def("canonicalize_smiles_bytes", &rdktools::canonicalize_smiles_bytes,
+          "Convert SMILES to canonical form as UTF-8 bytes",
+          "smiles_list"_a);
+    m.def("canonicalize_smiles_buffer", &rdktools::canonicalize_smiles_buffer,
+          "Convert SMILES to canonical form as one UTF-8 buffer and int64 offsets",
+          "smiles_list"_a);
+    
+    // Hash-based deduplication of a SMILES batch
+    m.def("deduplicate_smiles", &rdktools::deduplicate_smiles,
+          "Return first-occurrence indices and inverse positions of distinct SMILES",
+          "smiles_list"_a);
     
     // Morgan fingerprints
     m.def("calculate_morgan_fingerprints", &rdktools::calculate_morgan_fingerprints,
@@ -55,6 +113,60 @@ NB_MODULE(_rdktools_core, m) {
           "radius"_a = 2,
           "nbits"_a = 2048);
     
+    m.def("calculate_morgan_fingerprints_into", &rdktools::calculate_morgan_fingerprints_into,
+          "Calculate Morgan fingerprints into a preallocated (n, nbits) array",
+          "smiles_list"_a,
+          "out"_a.noconvert(),
+          "radius"_a = 2,
+          "nbits"_a = 2048);
+    
+    // Bit-packed Morgan fingerprints (ceil(nbits / 64) uint64 words per row)
+    m.def("calculate_morgan_fingerprints_packed", &rdktools::calculate_morgan_fingerprints_packed,
+          "Calculate Morgan fingerprints packed into uint64 words",
+          "smiles_list"_a,
+          "radius"_a = 2,
+          "nbits"_a = 2048);
+    m.def("calculate_morgan_fingerprints_packed_into", &rdktools::calculate_morgan_fingerprints_packed_into,
+          "Calculate packed Morgan fingerprints into a preallocated uint64 array",
+          "smiles_list"_a,
+          "out"_a.noconvert(),
+          "radius"_a = 2,
+          "nbits"_a = 2048);
+    
+    // Sparse Morgan fingerprints as CSR (indptr, indices)
+    m.def("calculate_morgan_fingerprints_sparse", &rdktools::calculate_morgan_fingerprints_sparse,
+          "Calculate Morgan fingerprints as CSR row offsets and set bit positions",
+          "smiles_list"_a,
+          "radius"_a = 2,
+          "nbits"_a = 2048);
+    
+    // Fused validation, descriptors and fingerprints into caller buffers
+    m.def("batch_all", &rdktools::batch_all,
+          "Validate, describe and fingerprint SMILES with a single parse each",
+          "smiles_list"_a,
+          "valid_out"_a.noconvert(),
+          "mw_out"_a.noconvert().none(),
+          "logp_out"_a.noconvert().none(),
+          "tpsa_out"_a.noconvert().none(),
+          "fp_out"_a.noconvert().none(),
+          "packed_fp_out"_a.noconvert().none(),
+          "radius"_a = 2,
+          "nbits"_a = 2048,
+          "chunk_size"_a = rdktools::kDefaultChunkSize);
+    
+    // Tanimoto similarity on packed fingerprints (SIMD popcount, runtime dispatch).
+    // Querying the backend selects the popcount kernel now, at import, so the
+    // CPUID checks never run inside a timed or threaded call
+    rdktools::popcount_backend();
+    m.def("tanimoto_matrix", &rdktools::tanimoto_matrix,
+          "All-pairs Tanimoto similarity of two packed fingerprint arrays",
+          "fps_a"_a, "fps_b"_a);
+    m.def("tanimoto_topk", &rdktools::tanimoto_topk,
+          "Indices and similarities of the k nearest database fingerprints per query",
+          "queries"_a, "database"_a, "k"_a);
+    m.def("popcount_backend", &rdktools::popcount_backend,
+          "Name of the popcount implementation selected for this CPU");
+    
     // ECFP reasoning trace
     m.def("ecfp_reasoning_trace", &rdktools::ecfp_reasoning_trace,
           "Generate an ECFP reasoning trace and fingerprint for a SMILES string",
@@ -64,7 +176,8 @@ NB_MODULE(_rdktools_core, m) {
           "kekulize"_a = false,
           "include_per_center"_a = true,
           "fingerprint_size"_a =
-              static_cast<int>(rdktools::kECFPReasoningFingerprintSize));
+              static_cast<int>(rdktools::kECFPReasoningFingerprintSize),
+          "as_bytes"_a = false);
     
     // Module version
     m.attr("__version__") = MACRO_STRINGIFY(VERSION_INFO);
@@ -0,0 +1,260 @@
+#include "similarity.hpp"
+#include "parallel.hpp"
+#include <algorithm>
+#include <bitset>
+#include <memory>
+#include <numeric>
+#include <stdexcept>
+#include <vector>
+
+// Runtime-dispatched popcount kernels on x86-64; other targets use the scalar path
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+#define RDKTOOLS_X86_DISPATCH 1
+#include <immintrin.h>
+#endif
+
+namespace rdktools {
+
+namespace nb = nanobind;
+
+namespace {
+
+using PopcountAndFn = uint64_t (*)(const uint64_t*, const uint64_t*, std::size_t);
+
+uint64_t popcount_and_scalar(const uint64_t* a, const uint64_t* b, std::size_t n_words) {
+    uint64_t total = 0;
+    for (std::size_t i = 0; i < n_words; ++i) {
+        total += std::bitset<64>(a[i] & b[i]).count();
+    }
+    return total;
+}
+
+#ifdef RDKTOOLS_X86_DISPATCH
+
+__attribute__((target("popcnt")))
+uint64_t popcount_and_popcnt(const uint64_t* a, const uint64_t* b, std::size_t n_words) {
+    uint64_t total = 0;
+    for (std::size_t i = 0; i < n_words; ++i) {
+        total += static_cast<uint64_t>(__builtin_popcountll(a[i] & b[i]));
+    }
+    return total;
+}
+
+// Mula's nibble lookup: VPSHUFB counts the bits of every 4-bit half of a byte
+// and VPSADBW sums the byte counts into 64-bit lanes
+__attribute__((target("avx2,popcnt")))
+uint64_t popcount_and_avx2(const uint64_t* a, const uint64_t* b, std::size_t n_words) {
+    const __m256i lookup = _mm256_setr_epi8(
+        0, 1, 1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 4,
+        0, 1, 1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 4);
+    const __m256i low_mask = _mm256_set1_epi8(0x0f);
+    __m256i totals = _mm256_setzero_si256();
+
+    std::size_t i = 0;
+    for (; i + 4 <= n_words; i += 4) {
+        const __m256i words = _mm256_and_si256(
+            _mm256_loadu_si256(reinterpret_cast<const __m256i*>(a + i)),
+            _mm256_loadu_si256(reinterpret_cast<const __m256i*>(b + i)));
+        const __m256i low = _mm256_and_si256(words, low_mask);
+        const __m256i high = _mm256_and_si256(_mm256_srli_epi16(words, 4), low_mask);
+        const __m256i counts = _mm256_add_epi8(
+            _mm256_shuffle_epi8(lookup, low), _mm256_shuffle_epi8(lookup, high));
+        totals = _mm256_add_epi64(totals, _mm256_sad_epu8(counts, _mm256_setzero_si256()));
+    }
+
+    uint64_t total = static_cast<uint64_t>(_mm256_extract_epi64(totals, 0)) +
+                     static_cast<uint64_t>(_mm256_extract_epi64(totals, 1)) +
+                     static_cast<uint64_t>(_mm256_extract_epi64(totals, 2)) +
+                     static_cast<uint64_t>(_mm256_extract_epi64(totals, 3));
+    for (; i < n_words; ++i) {
+        total += static_cast<uint64_t>(__builtin_popcountll(a[i] & b[i]));
+    }
+    return total;
+}
+
+__attribute__((target("avx512f,avx512vpopcntdq,popcnt")))
+uint64_t popcount_and_avx512(const uint64_t* a, const uint64_t* b, std::size_t n_words) {
+    __m512i totals = _mm512_setzero_si512();
+
+    std::size_t i = 0;
+    for (; i + 8 <= n_words; i += 8) {
+        const __m512i words = _mm512_and_si512(
+            _mm512_loadu_si512(a + i), _mm512_loadu_si512(b + i));
+        totals = _mm512_add_epi64(totals, _mm512_popcnt_epi64(words));
+    }
+
+    alignas(64) uint64_t lanes[8];
+    _mm512_store_si512(lanes, totals);
+    uint64_t total = 0;
+    for (uint64_t lane : lanes) {
+        total += lane;
+    }
+    for (; i < n_words; ++i) {
+        total += static_cast<uint64_t>(__builtin_popcountll(a[i] & b[i]));
+    }
+    return total;
+}
+
+#endif
+
+struct PopcountImpl {
+    PopcountAndFn fn;
+    const char* name;
+};
+
+PopcountImpl select_popcount() {
+#ifdef RDKTOOLS_X86_DISPATCH
+    __builtin_cpu_init();
+    if (__builtin_cpu_supports("avx512vpopcntdq")) {
+        return {popcount_and_avx512, "avx512_vpopcntdq"};
+    }
+    if (__builtin_cpu_supports("avx2")) {
+        return {popcount_and_avx2, "avx2"};
+    }
+    if (__builtin_cpu_supports("popcnt")) {
+        return {popcount_and_popcnt, "popcnt"};
+    }
+#endif
+    return {popcount_and_scalar, "scalar"};
+}
+
+const PopcountImpl& popcount_impl() {
+    static const PopcountImpl impl = select_popcount();
+    return impl;
+}
+
+void check_widths(const PackedFingerprints& fps_a, const PackedFingerprints& fps_b) {
+    if (fps_a.shape(1) != fps_b.shape(1)) {
+        throw std::invalid_argument("fingerprint arrays must have the same number of words");
+    }
+}
+
+// Bits set in every row of a packed fingerprint array
+std::vector<uint64_t> row_popcounts(const PackedFingerprints& fps, PopcountAndFn count) {
+    const std::size_t rows = fps.shape(0);
+    const std::size_t n_words = fps.shape(1);
+    std::vector<uint64_t> counts(rows);
+    for (std::size_t i = 0; i < rows; ++i) {
+        const uint64_t* row = fps.data() + i * n_words;
+        counts[i] = count(row, row, n_words);
+    }
+    return counts;
+}
+
+inline double tanimoto_from_counts(uint64_t both, uint64_t count_a, uint64_t count_b) {
+    const uint64_t either = count_a + count_b - both;
+    return either > 0 ? static_cast<double>(both) / static_cast<double>(either) : 0.0;
+}
+
+// Rows of fps_a scored together, so each fps_b row is loaded once per block
+constexpr std::size_t kRowBlock = 8;
+
+} // namespace
+
+uint64_t popcount_and(const uint64_t* a, const uint64_t* b, std::size_t n_words) {
+    return popcount_impl().fn(a, b, n_words);
+}
+
+const char* popcount_backend() {
+    return popcount_impl().name;
+}
+
+nb::ndarray<nb::numpy, double, nb::ndim<2>> tanimoto_matrix(
+    PackedFingerprints fps_a,
+    PackedFingerprints fps_b
+) {
+    check_widths(fps_a, fps_b);
+    const std::size_t n_a = fps_a.shape(0);
+    const std::size_t n_b = fps_b.shape(0);
+    const std::size_t n_words = fps_a.shape(1);
+    std::unique_ptr<double[]> data(new double[std::max<std::size_t>(n_a * n_b, 1)]);
+
+    {
+        nb::gil_scoped_release release;
+        const PopcountAndFn count = popcount_impl().fn;
+        const std::vector<uint64_t> counts_a = row_popcounts(fps_a, count);
+        const std::vector<uint64_t> counts_b = row_popcounts(fps_b, count);
+        const uint64_t* a = fps_a.data();
+        const uint64_t* b = fps_b.data();
+        double* out = data.get();
+
+        const std::size_t blocks = (n_a + kRowBlock - 1) / kRowBlock;
+        parallel_for(blocks, [&](std::size_t block) {
+            const std::size_t begin = block * kRowBlock;
+            const std::size_t end = std::min(begin + kRowBlock, n_a);
+            for (std::size_t j = 0; j < n_b; ++j) {
+                const uint64_t* row_b = b + j * n_words;
+                for (std::size_t i = begin; i < end; ++i) {
+                    const uint64_t both = count(a + i * n_words, row_b, n_words);
+                    out[i * n_b + j] = tanimoto_from_counts(both, counts_a[i], counts_b[j]);
+                }
+            }
+        }, 1);
+    }
+
+    nb::capsule owner(data.get(), [](void* p) noexcept {
+        delete[] static_cast<double*>(p);
+    });
+    return nb::ndarray<nb::numpy, double, nb::ndim<2>>(data.release(), {n_a, n_b}, owner);
+}
+
+nb::tuple tanimoto_topk(
+    PackedFingerprints queries,
+    PackedFingerprints database,
+    std::size_t k
+) {
+    check_widths(queries, database);
+    const std::size_t n_q = queries.shape(0);
+    const std::size_t n_db = database.shape(0);
+    const std::size_t n_words = queries.shape(1);
+    k = std::min(k, n_db);
+    const std::size_t size = std::max<std::size_t>(n_q * k, 1);
+    std::unique_ptr<int64_t[]> indices(new int64_t[size]);
+    std::unique_ptr<double[]> scores(new double[size]);
+
+    {
+        nb::gil_scoped_release release;
+        const PopcountAndFn count = popcount_impl().fn;
+        const std::vector<uint64_t> counts_q = row_popcounts(queries, count);
+        const std::vector<uint64_t> counts_db = row_popcounts(database, count);
+        const uint64_t* q = queries.data();
+        const uint64_t* db = database.data();
+
+        parallel_for(n_q, [&](std::size_t i) {
+            // Per-query scratch; scoring dominates the allocation
+            std::vector<double> similarity(n_db);
+            std::vector<int64_t> order(n_db);
+            const uint64_t* row_q = q + i * n_words;
+            for (std::size_t j = 0; j < n_db; ++j) {
+                const uint64_t both = count(row_q, db + j * n_words, n_words);
+                similarity[j] = tanimoto_from_counts(both, counts_q[i], counts_db[j]);
+            }
+            std::iota(order.begin(), order.end(), int64_t{0});
+            std::partial_sort(order.begin(), order.begin() + k, order.end(),
+                              [&](int64_t lhs, int64_t rhs) {
+                                  if (similarity[lhs] != similarity[rhs]) {
+                                      return similarity[lhs] > similarity[rhs];
+                                  }
+                                  return lhs < rhs;
+                              });
+            for (std::size_t r = 0; r < k; ++r) {
+                indices[i * k + r] = order[r];
+                scores[i * k + r] = similarity[order[r]];
+            }
+        });
+    }
+
+    nb::capsule indices_owner(indices.get(), [](void* p) noexcept {
+        delete[] static_cast<int64_t*>(p);
+    });
+    nb::capsule scores_owner(scores.get(), [](void* p) noexcept {
+        delete[] static_cast<double*>(p);
+    });
+    auto indices_array = nb::ndarray<nb::numpy, int64_t, nb::ndim<2>>(
+        indices.release(), {n_q, k}, indices_owner);
+    auto scores_array = nb::ndarray<nb::numpy, double, nb::ndim<2>>(
+        scores.release(), {n_q, k}, scores_owner);
+    return nb::make_tuple(indices_array, scores_array);
+}
+
+} // namespace rdktools
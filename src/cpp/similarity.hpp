@@ -0,0 +1,68 @@
+#pragma once
+
+#include <nanobind/nanobind.h>
+#include <nanobind/ndarray.h>
+#include <cstddef>
+#include <cstdint>
+
+namespace rdktools {
+
+// Read-only (n, n_words) bit-packed fingerprints, as from
+// calculate_morgan_fingerprints_packed
+using PackedFingerprints = nanobind::ndarray<
+    const uint64_t, nanobind::ndim<2>, nanobind::c_contig, nanobind::device::cpu>;
+
+/**
+ * @brief Count the bits set in both of two packed fingerprints
+ *
+ * Dispatches once, when the extension is imported, to the fastest
+ * implementation the CPU supports: AVX-512 VPOPCNTQ, an AVX2 nibble lookup
+ * (VPSHUFB), POPCNT or portable scalar code.
+ *
+ * @param a first fingerprint, n_words uint64 words
+ * @param b second fingerprint, n_words uint64 words
+ * @param n_words number of words in each fingerprint
+ * @return popcount(a & b)
+ */
+uint64_t popcount_and(const uint64_t* a, const uint64_t* b, std::size_t n_words);
+
+/**
+ * @brief Name of the popcount implementation selected for this CPU
+ *
+ * The first call performs the selection; the module init calls it so that
+ * happens at import.
+ *
+ * @return "avx512_vpopcntdq", "avx2", "popcnt" or "scalar"
+ */
+const char* popcount_backend();
+
+/**
+ * @brief All-pairs Tanimoto similarity of two sets of packed fingerprints
+ * @param fps_a (n_a, n_words) packed fingerprints
+ * @param fps_b (n_b, n_words) packed fingerprints
+ * @return (n_a, n_b) float64 numpy array; pairs with no bits set score 0
+ */
+nanobind::ndarray<nanobind::numpy, double, nanobind::ndim<2>> tanimoto_matrix(
+    PackedFingerprints fps_a,
+    PackedFingerprints fps_b
+);
+
+/**
+ * @brief The k most similar database fingerprints for every query
+ *
+ * Equivalent to sorting each row of tanimoto_matrix(queries, database) in
+ * descending order (ties by ascending index) and keeping the first k
+ * columns, without materialising the full matrix.
+ *
+ * @param queries (n_q, n_words) packed fingerprints
+ * @param database (n_db, n_words) packed fingerprints
+ * @param k number of neighbours per query, capped at n_db
+ * @return tuple of (n_q, k) int64 database indices and float64 similarities
+ */
+nanobind::tuple tanimoto_topk(
+    PackedFingerprints queries,
+    PackedFingerprints database,
+    std::size_t k
+);
+
+} // namespace rdktools
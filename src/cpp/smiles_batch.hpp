@@ -0,0 +1,261 @@
+#pragma once
+
+#include <nanobind/nanobind.h>
+#include <cstring>
+#include <exception>
+#include <memory>
+#include <string>
+#include <string_view>
+#include <vector>
+
+namespace rdktools {
+
+/**
+ * @brief Read-only view of a sequence of Python strings
+ *
+ * Holds UTF-8 views into the str objects of a list, tuple or numpy object
+ * array, so batch kernels read SMILES without copying them into std::string
+ * or padding them to a fixed width. The sequence is kept alive by the batch,
+ * which makes the views safe to read while the GIL is released. Object arrays
+ * are read through their buffer, without building an intermediate list.
+ *
+ * Elements that are not str are converted as the former
+ * np.array(..., dtype=str) conversion did: bytes are decoded as ASCII and
+ * other objects (None, numbers) replaced by their str(), so they come out as
+ * invalid SMILES such as 'None'. Nested sequences are rejected.
+ *
+ * Fixed-width numpy unicode arrays (dtype 'U') are read straight from their
+ * UCS-4 buffer and transcoded into one arena owned by the batch, instead of
+ * creating a numpy str object per element.
+ */
+class SmilesBatch {
+public:
+    size_t size() const { return views_.size(); }
+    bool empty() const { return views_.empty(); }
+    std::string_view operator[](size_t i) const { return views_[i]; }
+
+private:
+    friend struct nanobind::detail::type_caster<SmilesBatch>;
+
+    nanobind::object owner_;
+    // str() of the non-str elements, which the views point into
+    nanobind::object converted_;
+    // Shared so copies of the batch keep their views valid
+    std::shared_ptr<const std::string> arena_;
+    std::vector<std::string_view> views_;
+};
+
+} // namespace rdktools
+
+namespace nanobind::detail {
+
+template <> struct type_caster<rdktools::SmilesBatch> {
+    NB_TYPE_CASTER(rdktools::SmilesBatch, const_name("collections.abc.Sequence[str]"))
+
+    bool from_python(handle src, uint8_t, cleanup_list*) noexcept {
+        // A bare str is a sequence of characters, not of SMILES
+        if (PyUnicode_Check(src.ptr()) || PyBytes_Check(src.ptr())) {
+            return false;
+        }
+        // Building the views allocates; running out of memory fails the
+        // conversion instead of escaping this noexcept function
+        try {
+            if (PyObject_CheckBuffer(src.ptr()) && from_buffer(src)) {
+                return true;
+            }
+            return from_sequence(src);
+        } catch (const std::exception&) {
+            return false;
+        }
+    }
+
+private:
+    // Append the UTF-8 view of one element. Non-str elements are replaced by
+    // their conversion to str, kept alive in converted.
+    static bool append_item(PyObject* item, std::vector<std::string_view>& views,
+                            object& converted) {
+        if (!PyUnicode_Check(item)) {
+            const bool is_bytes = PyBytes_Check(item);
+            // A nested sequence is a shape error, not a SMILES string
+            if (!is_bytes && PySequence_Check(item)) {
+                return false;
+            }
+            // bytes are decoded as ASCII, like numpy's str conversion
+            PyObject* text = is_bytes ? PyUnicode_FromEncodedObject(item, "ascii", "strict")
+                                      : PyObject_Str(item);
+            if (!text) {
+                PyErr_Clear();
+                return false;
+            }
+            object owned = steal(text);
+            if (!converted.is_valid()) {
+                PyObject* list = PyList_New(0);
+                if (!list) {
+                    PyErr_Clear();
+                    return false;
+                }
+                converted = steal(list);
+            }
+            if (PyList_Append(converted.ptr(), text) != 0) {
+                PyErr_Clear();
+                return false;
+            }
+            item = text;
+        }
+        Py_ssize_t length = 0;
+        // UTF-8 is cached on the str object, so the view lives as long as it
+        const char* data = PyUnicode_AsUTF8AndSize(item, &length);
+        if (!data) {
+            PyErr_Clear();
+            return false;
+        }
+        views.emplace_back(data, static_cast<size_t>(length));
+        return true;
+    }
+
+    // List, tuple or other sequence; PySequence_Fast returns lists and tuples
+    // themselves rather than a copy
+    bool from_sequence(handle src) {
+        PyObject* seq = PySequence_Fast(src.ptr(), "");
+        if (!seq) {
+            PyErr_Clear();
+            return false;
+        }
+        object owner = steal(seq);
+
+        const Py_ssize_t size = PySequence_Fast_GET_SIZE(seq);
+        PyObject** items = PySequence_Fast_ITEMS(seq);
+        std::vector<std::string_view> views;
+        views.reserve(static_cast<size_t>(size));
+        object converted;
+        for (Py_ssize_t i = 0; i < size; ++i) {
+            if (!append_item(items[i], views, converted)) {
+                return false;
+            }
+        }
+
+        value.owner_ = std::move(owner);
+        value.converted_ = std::move(converted);
+        value.views_ = std::move(views);
+        return true;
+    }
+
+    // 1D numpy object array: the element pointers are read in place,
+    // honouring the stride, instead of being copied into a new list
+    bool from_object_buffer(handle src, const Py_buffer& view) {
+        const size_t size = static_cast<size_t>(view.shape[0]);
+        const Py_ssize_t stride = view.strides[0];
+        std::vector<std::string_view> views;
+        views.reserve(size);
+        object converted;
+        for (size_t i = 0; i < size; ++i) {
+            PyObject* item = nullptr;
+            std::memcpy(&item,
+                        static_cast<const char*>(view.buf) +
+                            static_cast<Py_ssize_t>(i) * stride,
+                        sizeof(item));
+            // numpy object arrays hold None for never-assigned elements, but
+            // guard against a null slot all the same
+            if (!item || !append_item(item, views, converted)) {
+                return false;
+            }
+        }
+
+        value.owner_ = borrow(src);
+        value.converted_ = std::move(converted);
+        value.views_ = std::move(views);
+        return true;
+    }
+
+    static void append_utf8(std::string& out, uint32_t code) {
+        if (code < 0x80) {
+            out.push_back(static_cast<char>(code));
+        } else if (code < 0x800) {
+            out.push_back(static_cast<char>(0xC0 | (code >> 6)));
+            out.push_back(static_cast<char>(0x80 | (code & 0x3F)));
+        } else if (code < 0x10000) {
+            out.push_back(static_cast<char>(0xE0 | (code >> 12)));
+            out.push_back(static_cast<char>(0x80 | ((code >> 6) & 0x3F)));
+            out.push_back(static_cast<char>(0x80 | (code & 0x3F)));
+        } else {
+            out.push_back(static_cast<char>(0xF0 | (code >> 18)));
+            out.push_back(static_cast<char>(0x80 | ((code >> 12) & 0x3F)));
+            out.push_back(static_cast<char>(0x80 | ((code >> 6) & 0x3F)));
+            out.push_back(static_cast<char>(0x80 | (code & 0x3F)));
+        }
+    }
+
+    // 1D object array (format "O"), or 1D native-endian UCS-4 buffer as
+    // exported by numpy 'U' arrays (format "<n>w"); anything else falls back
+    // to the sequence protocol
+    bool from_buffer(handle src) {
+        Py_buffer view;
+        if (PyObject_GetBuffer(src.ptr(), &view, PyBUF_RECORDS_RO) != 0) {
+            PyErr_Clear();
+            return false;
+        }
+        // Released on every return, and if an allocation below throws
+        struct BufferRelease {
+            Py_buffer* view;
+            ~BufferRelease() { PyBuffer_Release(view); }
+        } release{&view};
+        const char* format = view.format ? view.format : "B";
+        if (*format == '=' || *format == '@') {
+            ++format;
+        }
+        if (view.ndim == 1 && std::strcmp(format, "O") == 0 &&
+            view.itemsize == sizeof(PyObject*)) {
+            return from_object_buffer(src, view);
+        }
+        const size_t format_len = std::strlen(format);
+        const bool is_ucs4 = view.ndim == 1 && format_len > 0 &&
+                             format[format_len - 1] == 'w' &&
+                             std::strspn(format, "0123456789") == format_len - 1 &&
+                             view.itemsize % 4 == 0;
+        if (!is_ucs4) {
+            return false;
+        }
+
+        const size_t size = static_cast<size_t>(view.shape[0]);
+        const size_t width = static_cast<size_t>(view.itemsize) / 4;
+        const Py_ssize_t stride = view.strides[0];
+        std::string arena;
+        arena.reserve(size * width);
+        std::vector<size_t> ends;
+        ends.reserve(size);
+        for (size_t i = 0; i < size; ++i) {
+            const char* item = static_cast<const char*>(view.buf) +
+                               static_cast<Py_ssize_t>(i) * stride;
+            // numpy pads short strings with trailing NULs
+            size_t length = width;
+            uint32_t code = 0;
+            while (length > 0) {
+                std::memcpy(&code, item + 4 * (length - 1), 4);
+                if (code != 0) {
+                    break;
+                }
+                --length;
+            }
+            for (size_t c = 0; c < length; ++c) {
+                std::memcpy(&code, item + 4 * c, 4);
+                append_utf8(arena, code);
+            }
+            ends.push_back(arena.size());
+        }
+
+        // Views are taken only once the arena is in its final, heap-held place
+        auto owned = std::make_shared<const std::string>(std::move(arena));
+        std::vector<std::string_view> views;
+        views.reserve(size);
+        size_t begin = 0;
+        for (size_t end : ends) {
+            views.emplace_back(owned->data() + begin, end - begin);
+            begin = end;
+        }
+        value.arena_ = std::move(owned);
+        value.views_ = std::move(views);
+        return true;
+    }
+};
+
+} // namespace nanobind::detail
@@ -7,16 +7,34 @@
 #include "tensorflow/core/framework/tensor_shape.h"
 #include "tensorflow/core/lib/core/status.h"
 #include "tensorflow/core/platform/logging.h"
+#include "tensorflow/core/util/work_sharder.h"
 #include <GraphMol/Descriptors/MolDescriptors.h>
 #include <GraphMol/SmilesParse/SmilesParse.h>
 #include <GraphMol/GraphMol.h>
+#include <algorithm>
 #include <exception>
+#include <functional>
 #include <memory>
 #include <string>
 #include <vector>
 
 namespace tensorflow {
 
+namespace {
+
+// Rough per-SMILES cost in cycles, used by Shard to size the work blocks
+constexpr int64_t kStringProcessCostPerElement = 500000;
+constexpr int64_t kFormulaProcessCostPerElement = 50000;
+
+// Run work(begin, end) over [0, total) on the op's intra-op thread pool
+void ShardElements(OpKernelContext* context, int64_t total, int64_t cost_per_unit,
+                   const std::function<void(int64_t, int64_t)>& work) {
+  auto* workers = context->device()->tensorflow_cpu_worker_threads()->workers;
+  Shard(workers->NumThreads(), workers, total, cost_per_unit, work);
+}
+
+}  // namespace
+
 // Register the custom op
 REGISTER_OP("StringProcess")
     .Input("input_strings: string")
@@ -92,50 +110,38 @@ void StringProcessOp::Compute(OpKernelContext* context) {
   // Get flat views of the tensors
   auto input_flat = input_tensor.flat<tstring>();
   auto output_flat = output_tensor->flat<tstring>();
-  auto fingerprint_flat = fingerprint_tensor->flat<uint8>();
+  uint8* fingerprint_data = fingerprint_tensor->flat<uint8>().data();
+  const std::size_t row_size = static_cast<std::size_t>(fingerprint_size_);
 
+  // Elements are independent; each shard processes a contiguous range and
+  // writes every fingerprint straight into its row of the output tensor
   const int64_t num_elements = input_flat.size();
-  for (int64_t i = 0; i < num_elements; ++i) {
-    const std::string smiles = input_flat(i);
-    rdktools::ReasoningTraceResult trace_result;
-    try {
-      trace_result = rdktools::ecfp_reasoning_trace_from_smiles(
-          smiles, 2U, true, false, true,
-          static_cast<std::size_t>(fingerprint_size_));
-    } catch (const std::exception& e) {
-      trace_result = rdktools::ReasoningTraceResult(
-          std::string("[error] ") + e.what(),
-          std::vector<std::uint8_t>(
-              static_cast<std::size_t>(fingerprint_size_), 0));
-    }
-
-    std::string trace = std::move(std::get<0>(trace_result));
-    std::vector<std::uint8_t> fingerprint =
-        std::move(std::get<1>(trace_result));
-
-    const std::size_t expected_size =
-        static_cast<std::size_t>(fingerprint_size_);
-    if (fingerprint.size() != expected_size) {
-      fingerprint.resize(expected_size, 0);
-    }
+  auto process_range = [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; ++i) {
+      const std::string smiles = input_flat(i);
+      uint8* row = fingerprint_data + static_cast<std::size_t>(i) * row_size;
+      std::string trace;
+      try {
+        trace = rdktools::ecfp_reasoning_trace_into(
+            smiles, 2U, true, false, true, row, row_size);
+      } catch (const std::exception& e) {
+        std::fill(row, row + row_size, 0);
+        trace = std::string("[error] ") + e.what();
+      }
 
-    if (trace.empty()) {
-      if (smiles.empty()) {
-        output_flat(i) = "";
+      if (trace.empty()) {
+        if (smiles.empty()) {
+          output_flat(i) = "";
+        } else {
+          output_flat(i) = "[invalid]";
+        }
       } else {
-        output_flat(i) = "[invalid]";
+        output_flat(i) = std::move(trace);
       }
-    } else {
-      output_flat(i) = std::move(trace);
-    }
-
-    const int64_t base_index =
-        i * static_cast<int64_t>(fingerprint_size_);
-    for (std::size_t j = 0; j < expected_size; ++j) {
-      fingerprint_flat(base_index + static_cast<int64_t>(j)) =
-          fingerprint[j];
     }
-  }
+  };
+  ShardElements(context, num_elements, kStringProcessCostPerElement,
+                process_range);
 }
 
 // Register the kernel for CPU
@@ -177,33 +183,37 @@ void FormulaProcessOp::Compute(OpKernelContext* context) {
   auto output_flat = output_tensor->flat<tstring>();
 
   const int64_t num_elements = input_flat.size();
-  for (int64_t i = 0; i < num_elements; ++i) {
-    const std::string smiles = input_flat(i);
+  auto process_range = [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; ++i) {
+      const std::string smiles = input_flat(i);
 
-    if (smiles.empty()) {
-      output_flat(i) = "";
-      continue;
-    }
+      if (smiles.empty()) {
+        output_flat(i) = "";
+        continue;
+      }
 
-    std::string result;
-    try {
-      std::unique_ptr<RDKit::ROMol> mol(RDKit::SmilesToMol(smiles));
-      if (mol) {
-        const std::string formula =
-            RDKit::Descriptors::calcMolFormula(*mol);
-        result.reserve(formula.size() + 5 + smiles.size());
-        result.append(formula);
-        result.append("[SEP]");
-        result.append(smiles);
-      } else {
-        result = "[invalid]";
+      std::string result;
+      try {
+        std::unique_ptr<RDKit::ROMol> mol(RDKit::SmilesToMol(smiles));
+        if (mol) {
+          const std::string formula =
+              RDKit::Descriptors::calcMolFormula(*mol);
+          result.reserve(formula.size() + 5 + smiles.size());
+          result.append(formula);
+          result.append("[SEP]");
+          result.append(smiles);
+        } else {
+          result = "[invalid]";
+        }
+      } catch (const std::exception& e) {
+        result = std::string("[error] ") + e.what();
       }
-    } catch (const std::exception& e) {
-      result = std::string("[error] ") + e.what();
-    }
 
-    output_flat(i) = std::move(result);
-  }
+      output_flat(i) = std::move(result);
+    }
+  };
+  ShardElements(context, num_elements, kFormulaProcessCostPerElement,
+                process_range);
 }
 
 REGISTER_KERNEL_BUILDER(Name("FormulaProcess").Device(DEVICE_CPU),
@@ -3,12 +3,28 @@ RDK-Tools: High-performance molecular operations using RDKit's C++ core through
 
 This module provides fast molecular descriptor calculations, SMILES validation, and fingerprint
 generation by exposing RDKit's optimized C++ implementation with native numpy array support.
+
+Batch functions block RDKit's logging while they run, so invalid SMILES do not print a parse
+error each. RDKit's log state is process-wide: messages RDKit logs from any other thread of
+the process during a batch are dropped too.
 """
 
-from typing import Dict, Tuple
+import collections
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple, Union
 
 import numpy as np
 
+from .similarity import (
+    bulk_tanimoto,
+    pack_fingerprints,
+    tanimoto,
+    tanimoto_matrix,
+    tanimoto_topk,
+    unpack_fingerprints,
+)
+
 # Import the compiled C++ extension
 try:
     from . import _rdktools_core
@@ -29,114 +45,395 @@ def _check_extension():
 
 
 def _validate_smiles_input(smiles) -> np.ndarray:
-    """Convert and validate SMILES input to numpy string array."""
+    """
+    Convert and validate SMILES input to a one-dimensional numpy string array.
+
+    Lists become object arrays holding references to the original strings,
+    which the C++ core reads in place as UTF-8; building a fixed-width
+    ``dtype=str`` array would first scan for the longest SMILES and pad every
+    one to it. ``np.fromiter`` copies only the references, skipping the nested
+    sequence discovery of ``np.asarray``; nested lists then fail in the core's
+    string check. Object and unicode arrays are returned as they are; the core
+    reads fixed-width unicode arrays directly from their buffer.
+    """
     if isinstance(smiles, (list, tuple)):
-        smiles = np.array(smiles, dtype=str)
+        smiles = np.fromiter(smiles, dtype=object, count=len(smiles))
     elif isinstance(smiles, str):
-        smiles = np.array([smiles], dtype=str)
+        smiles = np.array([smiles], dtype=object)
     elif isinstance(smiles, np.ndarray):
-        smiles = smiles.astype(str)
+        # Only non-string dtypes (bytes, numbers) need decoding to str
+        if smiles.dtype.kind not in ("U", "O"):
+            smiles = smiles.astype(str)
     else:
         raise TypeError("SMILES input must be string, list, or numpy array")
 
+    if smiles.ndim != 1:
+        raise TypeError("SMILES array must be one-dimensional")
+
     return smiles
 
 
+def _deduplicate(smiles: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Reduce SMILES to their distinct values.
+
+    Returns the distinct SMILES and the inverse indices that map them back onto
+    the input, or the input unchanged and ``None`` if nothing is repeated.
+    Distinct strings are found by the core in one hashing pass, in order of
+    first occurrence; ``np.unique`` would sort them, comparing object arrays
+    element by element in Python.
+    """
+    first, inverse = _rdktools_core.deduplicate_smiles(smiles)
+    if len(first) == len(smiles):
+        return smiles, None
+    return smiles[first], inverse
+
+
+def _scatter(result, inverse: np.ndarray, out: Optional[np.ndarray] = None):
+    """Expand per-distinct-SMILES results (an array or dict of arrays) to the input."""
+    if isinstance(result, dict):
+        return {key: value[inverse] for key, value in result.items()}
+    return np.take(result, inverse, axis=0, out=out)
+
+
+def _dedup_dispatch(fn, fn_into, smiles: np.ndarray, *args, out=None, dedup=True):
+    """
+    Run a core kernel, parsing each distinct SMILES only once.
+
+    ``fn(smiles, *args)`` returns the results and ``fn_into(smiles, out, *args)``
+    writes them into ``out``. With ``dedup`` the kernel only sees the distinct
+    SMILES and the results are scattered back to the input order.
+    """
+    if dedup:
+        smiles, inverse = _deduplicate(smiles)
+        if inverse is not None:
+            return _scatter(fn(smiles, *args), inverse, out)
+    if out is not None:
+        fn_into(smiles, out, *args)
+        return out
+    return fn(smiles, *args)
+
+
 # Core descriptor functions
-def molecular_weights(smiles) -> np.ndarray:
+def molecular_weights(
+    smiles, out: Optional[np.ndarray] = None, dedup: bool = True
+) -> np.ndarray:
     """
     Calculate molecular weights for an array of SMILES strings.
 
     Args:
         smiles: Array-like of SMILES strings
+        out: Optional preallocated C-contiguous float64 array with one element
+            per SMILES (e.g. a slice of a larger array) to write results into
+        dedup: Parse each distinct SMILES only once and copy its result to
+            every repeat (default: True). Disable for all-unique inputs to
+            skip the extra hashing pass.
 
     Returns:
         numpy array of molecular weights (float64). Invalid SMILES return NaN.
+        When ``out`` is given it is filled and returned.
     """
     _check_extension()
     smiles = _validate_smiles_input(smiles)
-    return _rdktools_core.calculate_molecular_weights(smiles)
+    return _dedup_dispatch(
+        _rdktools_core.calculate_molecular_weights,
+        _rdktools_core.calculate_molecular_weights_into,
+        smiles,
+        out=out,
+        dedup=dedup,
+    )
 
 
-def logp(smiles) -> np.ndarray:
+def logp(
+    smiles, out: Optional[np.ndarray] = None, dedup: bool = True
+) -> np.ndarray:
     """
     Calculate LogP values for an array of SMILES strings.
 
     Args:
         smiles: Array-like of SMILES strings
+        out: Optional preallocated C-contiguous float64 array with one element
+            per SMILES (e.g. a slice of a larger array) to write results into
+        dedup: Parse each distinct SMILES only once and copy its result to
+            every repeat (default: True). Disable for all-unique inputs to
+            skip the extra hashing pass.
 
     Returns:
         numpy array of LogP values (float64). Invalid SMILES return NaN.
+        When ``out`` is given it is filled and returned.
     """
     _check_extension()
     smiles = _validate_smiles_input(smiles)
-    return _rdktools_core.calculate_logp(smiles)
+    return _dedup_dispatch(
+        _rdktools_core.calculate_logp,
+        _rdktools_core.calculate_logp_into,
+        smiles,
+        out=out,
+        dedup=dedup,
+    )
 
 
-def tpsa(smiles) -> np.ndarray:
+def tpsa(
+    smiles, out: Optional[np.ndarray] = None, dedup: bool = True
+) -> np.ndarray:
     """
     Calculate TPSA (Topological Polar Surface Area) for an array of SMILES strings.
 
     Args:
         smiles: Array-like of SMILES strings
+        out: Optional preallocated C-contiguous float64 array with one element
+            per SMILES (e.g. a slice of a larger array) to write results into
+        dedup: Parse each distinct SMILES only once and copy its result to
+            every repeat (default: True). Disable for all-unique inputs to
+            skip the extra hashing pass.
 
     Returns:
         numpy array of TPSA values (float64). Invalid SMILES return NaN.
+        When ``out`` is given it is filled and returned.
     """
     _check_extension()
     smiles = _validate_smiles_input(smiles)
-    return _rdktools_core.calculate_tpsa(smiles)
+    return _dedup_dispatch(
+        _rdktools_core.calculate_tpsa,
+        _rdktools_core.calculate_tpsa_into,
+        smiles,
+        out=out,
+        dedup=dedup,
+    )
 
 
 # Validation functions
-def is_valid(smiles) -> np.ndarray:
+def is_valid(
+    smiles, out: Optional[np.ndarray] = None, dedup: bool = True
+) -> np.ndarray:
     """
     Check if SMILES strings are valid.
 
     Args:
         smiles: Array-like of SMILES strings
+        out: Optional preallocated C-contiguous bool array with one element
+            per SMILES string. Results are written in place and ``out`` is
+            returned.
+        dedup: Parse each distinct SMILES only once and copy its result to
+            every repeat (default: True). Disable for all-unique inputs to
+            skip the extra hashing pass.
 
     Returns:
         numpy array of boolean values indicating validity.
     """
     _check_extension()
     smiles = _validate_smiles_input(smiles)
-    return _rdktools_core.validate_smiles(smiles)
+    return _dedup_dispatch(
+        _rdktools_core.validate_smiles,
+        _rdktools_core.validate_smiles_into,
+        smiles,
+        out=out,
+        dedup=dedup,
+    )
+
+
+def is_valid_packed(smiles, dedup: bool = True) -> np.ndarray:
+    """
+    Check if SMILES strings are valid, as a bit-packed mask.
+
+    One bit per SMILES, in the layout of packed fingerprints, so
+    ``unpack_fingerprints(mask, len(smiles))`` recovers the ``is_valid``
+    result as 0/1. Eight times smaller than the bool array, and combinable
+    with other packed masks using NumPy's bitwise operators.
 
+    Args:
+        smiles: Array-like of SMILES strings
+        dedup: Parse each distinct SMILES only once (default: True)
 
-def canonical_smiles(smiles) -> np.ndarray:
+    Returns:
+        uint64 array of ``ceil(len(smiles) / 64)`` words; SMILES ``i`` is
+        valid when bit ``i % 64`` of word ``i // 64`` is set.
+    """
+    _check_extension()
+    smiles = _validate_smiles_input(smiles)
+    if dedup:
+        unique, inverse = _deduplicate(smiles)
+        if inverse is not None:
+            valid = _rdktools_core.validate_smiles(unique)[inverse]
+            return pack_fingerprints(valid)
+    return _rdktools_core.validate_smiles_packed(smiles)
+
+
+def canonical_smiles(
+    smiles, dedup: bool = True, as_bytes: bool = False
+) -> np.ndarray:
     """
     Convert SMILES to canonical form.
 
     Args:
         smiles: Array-like of SMILES strings
+        dedup: Parse each distinct SMILES only once and copy its result to
+            every repeat (default: True). Disable for all-unique inputs to
+            skip the extra hashing pass.
+        as_bytes: Return UTF-8 ``bytes`` instead of ``str``, skipping the
+            decode for consumers such as hashing or ``tf.string`` tensors
+            (default: False)
 
     Returns:
-        numpy array of canonical SMILES strings. Invalid SMILES return empty strings.
+        numpy object array of canonical SMILES strings (or bytes). Invalid
+        SMILES return empty strings.
     """
     _check_extension()
     smiles = _validate_smiles_input(smiles)
-    return _rdktools_core.canonicalize_smiles(smiles)
+    return _dedup_dispatch(_canonicalize, None, smiles, as_bytes, dedup=dedup)
+
+
+def _canonicalize(smiles: np.ndarray, as_bytes: bool = False) -> np.ndarray:
+    """
+    Canonicalize SMILES into an object array of Python strings or bytes.
+
+    Object arrays hold one reference per SMILES, where a fixed-width unicode
+    array would pad every entry to the longest one at four bytes per character.
+    """
+    if as_bytes:
+        canonical = _rdktools_core.canonicalize_smiles_bytes(smiles)
+    else:
+        canonical = _rdktools_core.canonicalize_smiles(smiles)
+    return np.fromiter(canonical, dtype=object, count=len(canonical))
+
+
+def canonical_smiles_arrow(
+    smiles, dedup: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert SMILES to canonical form as one contiguous UTF-8 buffer.
+
+    Uses the value/offset layout of Arrow's ``large_string`` arrays, so no
+    Python string is created per molecule; the buffer can go straight to
+    byte-oriented consumers such as ``tf.io.decode_raw`` or
+    ``pyarrow.LargeStringArray.from_buffers``.
+
+    Args:
+        smiles: Array-like of SMILES strings
+        dedup: Parse each distinct SMILES only once and copy its result to
+            every repeat (default: True)
+
+    Returns:
+        Tuple ``(data, offsets)`` of a uint8 array of UTF-8 bytes and an int64
+        array of ``len(smiles) + 1`` offsets: canonical SMILES ``i`` is
+        ``data[offsets[i]:offsets[i + 1]]``. Invalid SMILES are empty.
+    """
+    _check_extension()
+    smiles = _validate_smiles_input(smiles)
+    inverse = None
+    if dedup:
+        smiles, inverse = _deduplicate(smiles)
+    data, offsets = _rdktools_core.canonicalize_smiles_buffer(smiles)
+    if inverse is None:
+        return data, offsets
+
+    # Gather each row's byte range from the distinct results
+    starts = offsets[:-1][inverse]
+    lengths = np.diff(offsets)[inverse]
+    scattered_offsets = np.zeros(len(inverse) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=scattered_offsets[1:])
+    shift = np.repeat(starts - scattered_offsets[:-1], lengths)
+    return data[shift + np.arange(len(shift))], scattered_offsets
 
 
 # Batch processing functions
-def descriptors(smiles) -> Dict[str, np.ndarray]:
+DESCRIPTOR_NAMES = ("molecular_weight", "logp", "tpsa")
+
+
+# Alignment of descriptor blocks, matching the extension's allocations
+_CACHE_LINE_BYTES = 64
+
+
+def _aligned_empty(shape: Tuple[int, ...]) -> np.ndarray:
+    """Allocate an uninitialised C-contiguous float64 array on a cache line."""
+    nbytes = int(np.prod(shape)) * np.dtype(np.float64).itemsize
+    raw = np.empty(nbytes + _CACHE_LINE_BYTES, dtype=np.uint8)
+    offset = -raw.ctypes.data % _CACHE_LINE_BYTES
+    return raw[offset : offset + nbytes].view(np.float64).reshape(shape)
+
+
+def _descriptor_block(smiles: np.ndarray, dedup: bool) -> np.ndarray:
+    """Compute the C-contiguous, cache-aligned (3, n) descriptor block."""
+    inverse = None
+    if dedup:
+        smiles, inverse = _deduplicate(smiles)
+    block = _rdktools_core.calculate_descriptor_matrix(smiles)
+    if inverse is not None:
+        expanded = _aligned_empty((len(DESCRIPTOR_NAMES), len(inverse)))
+        np.take(block, inverse, axis=1, out=expanded)
+        block = expanded
+    return block
+
+
+def descriptors(
+    smiles, out: Optional[Dict[str, np.ndarray]] = None, dedup: bool = True
+) -> Dict[str, np.ndarray]:
     """
     Calculate multiple descriptors efficiently in one pass.
 
     Args:
         smiles: Array-like of SMILES strings
+        out: Optional dictionary mapping every name in ``DESCRIPTOR_NAMES`` to
+            a preallocated C-contiguous float64 array (or slice view) with one
+            element per SMILES string. Results are written in place and
+            ``out`` is returned.
+        dedup: Parse each distinct SMILES only once and copy its result to
+            every repeat (default: True). Disable for all-unique inputs to
+            skip the extra hashing pass.
 
     Returns:
         Dictionary with keys: 'molecular_weight', 'logp', 'tpsa'
         Each value is a numpy array. Invalid SMILES have NaN values.
+        Unless ``out`` is given, the arrays are consecutive rows of one shared
+        C-contiguous (3, n) block that starts on a 64-byte cache line.
     """
     _check_extension()
     smiles = _validate_smiles_input(smiles)
-    return _rdktools_core.calculate_multiple_descriptors(smiles)
+    if out is None:
+        return dict(zip(DESCRIPTOR_NAMES, _descriptor_block(smiles, dedup)))
+
+    targets = [out[name] for name in DESCRIPTOR_NAMES]
+    inverse = None
+    if dedup:
+        smiles, inverse = _deduplicate(smiles)
+    if inverse is None:
+        _rdktools_core.calculate_multiple_descriptors_into(smiles, *targets)
+    else:
+        block = _rdktools_core.calculate_descriptor_matrix(smiles)
+        for row, target in zip(block, targets):
+            np.take(row, inverse, out=target)
+    return out
 
 
-def morgan_fingerprints(smiles, radius: int = 2, nbits: int = 2048) -> np.ndarray:
+def descriptors_matrix(smiles, dedup: bool = True) -> np.ndarray:
+    """
+    Calculate molecular weight, LogP and TPSA as a single feature matrix.
+
+    Args:
+        smiles: Array-like of SMILES strings
+        dedup: Parse each distinct SMILES only once (default: True)
+
+    Returns:
+        float64 array of shape (n_molecules, 3) with columns ordered as
+        ``DESCRIPTOR_NAMES``. It is a transposed view of the cache-aligned
+        (3, n) block behind ``descriptors``, so each column is contiguous; use
+        ``np.ascontiguousarray`` if row-major storage is required. Invalid
+        SMILES have NaN rows.
+    """
+    _check_extension()
+    smiles = _validate_smiles_input(smiles)
+    return _descriptor_block(smiles, dedup).T
+
+
+def morgan_fingerprints(
+    smiles,
+    radius: int = 2,
+    nbits: int = 2048,
+    out: Optional[np.ndarray] = None,
+    packed: bool = False,
+    dedup: bool = True,
+    sparse: bool = False,
+) -> np.ndarray:
     """
     Calculate Morgan fingerprints for an array of SMILES strings.
 
@@ -144,14 +441,63 @@ def morgan_fingerprints(smiles, radius: int = 2, nbits: int = 2048) -> np.ndarra
         smiles: Array-like of SMILES strings
         radius: Fingerprint radius (default: 2)
         nbits: Number of bits in fingerprint (default: 2048)
+        out: Optional preallocated C-contiguous array matching the returned
+            shape and dtype to write the fingerprints into
+        packed: If true, pack 64 bits into each uint64 word (bit ``j`` lives in
+            word ``j // 64`` at position ``j % 64``), using 8x less memory.
+        dedup: Parse each distinct SMILES only once and copy its result to
+            every repeat (default: True). Disable for all-unique inputs to
+            skip the extra hashing pass.
+        sparse: If true, return a ``scipy.sparse.csr_matrix`` storing only the
+            set bits, for long or low-density fingerprints (large ``nbits`` or
+            ``radius``). Requires SciPy; cannot be combined with ``packed`` or
+            ``out``.
 
     Returns:
-        2D numpy array of shape (n_molecules, nbits) with uint8 values (0 or 1).
-        Invalid SMILES have all-zero fingerprints.
+        2D numpy array of shape (n_molecules, nbits) with uint8 values (0 or 1),
+        or of shape (n_molecules, ceil(nbits / 64)) with uint64 words when
+        ``packed`` is true, or a uint8 CSR matrix of shape (n_molecules, nbits)
+        when ``sparse`` is true. Invalid SMILES have all-zero fingerprints.
+        When ``out`` is given it is filled and returned.
     """
     _check_extension()
     smiles = _validate_smiles_input(smiles)
-    return _rdktools_core.calculate_morgan_fingerprints(smiles, radius, nbits)
+    if sparse:
+        if packed or out is not None:
+            raise ValueError("sparse=True cannot be combined with packed or out")
+        return _sparse_fingerprints(smiles, radius, nbits, dedup)
+    if packed:
+        fn = _rdktools_core.calculate_morgan_fingerprints_packed
+        fn_into = _rdktools_core.calculate_morgan_fingerprints_packed_into
+    else:
+        fn = _rdktools_core.calculate_morgan_fingerprints
+        fn_into = _rdktools_core.calculate_morgan_fingerprints_into
+    return _dedup_dispatch(
+        fn, fn_into, smiles, radius, nbits, out=out, dedup=dedup
+    )
+
+
+def _sparse_fingerprints(smiles: np.ndarray, radius: int, nbits: int, dedup: bool):
+    """Build a CSR fingerprint matrix from the core's (indptr, indices) rows."""
+    try:
+        from scipy import sparse
+    except ImportError:
+        raise ImportError(
+            "sparse=True requires SciPy: "
+            "pip install rdkit-data-pipeline-tools[sparse]"
+        ) from None
+
+    inverse = None
+    if dedup:
+        smiles, inverse = _deduplicate(smiles)
+    indptr, indices = _rdktools_core.calculate_morgan_fingerprints_sparse(
+        smiles, radius, nbits
+    )
+    data = np.ones(len(indices), dtype=np.uint8)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(smiles), nbits))
+    if inverse is not None:
+        matrix = matrix[inverse]
+    return matrix
 
 
 ECFP_REASONING_FINGERPRINT_SIZE = 2048
@@ -165,7 +511,8 @@ def ecfp_reasoning_trace(
     kekulize: bool = False,
     include_per_center: bool = True,
     fingerprint_size: int = ECFP_REASONING_FINGERPRINT_SIZE,
-) -> Tuple[str, np.ndarray]:
+    as_bytes: bool = False,
+) -> Tuple[Union[str, bytes], np.ndarray]:
     """
     Generate an ECFP reasoning trace for a single SMILES string.
 
@@ -177,6 +524,9 @@ def ecfp_reasoning_trace(
         include_per_center: Whether to append per-atom environment chains
         fingerprint_size: Desired fingerprint length in bits (default: 2048).
             Non-positive values fall back to the default length.
+        as_bytes: Return the trace as UTF-8 ``bytes``, skipping the decode
+            when only the fingerprint or the raw text is needed
+            (default: False)
 
     Returns:
         Tuple where the first element is the multi-line reasoning trace text
@@ -194,37 +544,119 @@ def ecfp_reasoning_trace(
         if fingerprint_size > 0
         else ECFP_REASONING_FINGERPRINT_SIZE
     )
-    trace, fingerprint = _rdktools_core.ecfp_reasoning_trace(
+    # The core writes the fingerprint into a uint8 array of exactly
+    # target_size elements, so it is returned as is
+    return _rdktools_core.ecfp_reasoning_trace(
         smiles,
         radius,
         isomeric,
         kekulize,
         include_per_center,
         target_size,
+        as_bytes,
     )
-    fingerprint = np.asarray(fingerprint, dtype=np.uint8).reshape(-1)
-    if target_size > 0 and fingerprint.size != target_size:
-        padded = np.zeros(target_size, dtype=np.uint8)
-        length = min(fingerprint.size, target_size)
-        padded[:length] = fingerprint[:length]
-        fingerprint = padded
-    return trace, fingerprint
 
 
 # Convenience functions
-def filter_valid(smiles) -> np.ndarray:
+def filter_valid(
+    smiles, return_mask: bool = False, dedup: bool = True
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
     """
     Filter array to only valid SMILES strings.
 
     Args:
         smiles: Array-like of SMILES strings
+        return_mask: Also return the validity mask, so callers that need both
+            the mask and the filtered SMILES parse them only once
+        dedup: Parse each distinct SMILES only once (default: True)
 
     Returns:
-        numpy array containing only valid SMILES strings.
+        numpy array containing only valid SMILES strings, or a tuple of that
+        array and the boolean validity mask when ``return_mask`` is true.
     """
     smiles = _validate_smiles_input(smiles)
-    valid_mask = is_valid(smiles)
-    return smiles[valid_mask]
+    valid_mask = is_valid(smiles, dedup=dedup)
+    # Compaction moves object pointers only; no string data is copied
+    valid_smiles = np.compress(valid_mask, smiles)
+    if return_mask:
+        return valid_smiles, valid_mask
+    return valid_smiles
+
+
+def _allocate_results(
+    n_molecules: int,
+    include_descriptors: bool,
+    include_fingerprints: bool,
+    nbits: int,
+    packed: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Allocate the batch_process result arrays in result order.
+
+    The arrays are left uninitialised: batch_all writes every element,
+    including the NaN descriptors and zero fingerprints of invalid SMILES.
+    """
+    results = {"valid": np.empty(n_molecules, dtype=bool)}
+
+    if include_descriptors:
+        results.update(
+            {key: np.empty(n_molecules, dtype=np.float64) for key in DESCRIPTOR_NAMES}
+        )
+
+    if include_fingerprints:
+        if packed:
+            shape, dtype = (n_molecules, (nbits + 63) // 64), np.uint64
+        else:
+            shape, dtype = (n_molecules, nbits), np.uint8
+        results["fingerprints"] = np.empty(shape, dtype=dtype)
+
+    return results
+
+
+@functools.lru_cache(maxsize=32)
+def _make_batch_worker(
+    include_descriptors: bool,
+    include_fingerprints: bool,
+    radius: int,
+    nbits: int,
+    chunk_size: int,
+    packed: bool = False,
+):
+    """
+    Build the ``batch_all`` call for one output configuration.
+
+    The worker takes the SMILES followed by the requested outputs in
+    ``batch_process`` result order (valid, descriptors, fingerprints), with
+    the configuration baked in rather than re-checked on every call.
+    """
+    batch_all = _rdktools_core.batch_all
+
+    def call(smiles, valid, mw=None, logp=None, tpsa=None, fingerprints=None):
+        # Fingerprints go to the unpacked or packed buffer slot
+        fps = (None, fingerprints) if packed else (fingerprints, None)
+        batch_all(smiles, valid, mw, logp, tpsa, *fps, radius, nbits, chunk_size)
+
+    if include_descriptors and include_fingerprints:
+
+        def worker(smiles, valid, mw, logp, tpsa, fingerprints):
+            call(smiles, valid, mw, logp, tpsa, fingerprints)
+
+    elif include_descriptors:
+
+        def worker(smiles, valid, mw, logp, tpsa):
+            call(smiles, valid, mw, logp, tpsa)
+
+    elif include_fingerprints:
+
+        def worker(smiles, valid, fingerprints):
+            call(smiles, valid, fingerprints=fingerprints)
+
+    else:
+
+        def worker(smiles, valid):
+            call(smiles, valid)
+
+    return worker
 
 
 def batch_process(
@@ -234,61 +666,294 @@ def batch_process(
     include_fingerprints: bool = False,
     radius: int = 2,
     nbits: int = 2048,
+    dedup: bool = True,
+    packed: bool = False,
 ) -> Dict[str, np.ndarray]:
     """
-    Process large datasets in batches for memory efficiency.
+    Validate, describe and fingerprint SMILES in a single pass.
 
     Args:
         smiles: Array-like of SMILES strings
-        batch_size: Number of molecules per batch
+        batch_size: Number of molecules the C++ core hands to a thread at a
+            time. Only a scheduling hint: it is reduced when it would leave
+            threads idle, and it does not change the results.
         include_descriptors: Whether to calculate molecular descriptors
         include_fingerprints: Whether to calculate fingerprints
         radius: Fingerprint radius (if calculating fingerprints)
         nbits: Fingerprint size (if calculating fingerprints)
+        dedup: Parse each distinct SMILES only once and copy its result to
+            every repeat (default: True). Disable for all-unique inputs to
+            skip the extra hashing pass.
+        packed: Return fingerprints bit-packed as in
+            ``morgan_fingerprints(..., packed=True)`` (default: False)
 
     Returns:
         Dictionary with results. Always includes 'valid' boolean array.
         If include_descriptors: adds 'molecular_weight', 'logp', 'tpsa'
-        If include_fingerprints: adds 'fingerprints' 2D array
+        If include_fingerprints: adds 'fingerprints' 2D array, uint8 of shape
+        (n, nbits) or uint64 of shape (n, ceil(nbits / 64)) when packed
     """
+    _check_extension()
     smiles = _validate_smiles_input(smiles)
-    n_molecules = len(smiles)
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    inverse = None
+    if dedup:
+        smiles, inverse = _deduplicate(smiles)
+
+    results = _allocate_results(
+        len(smiles), include_descriptors, include_fingerprints, nbits, packed
+    )
+    # One call fills every output in place; each SMILES is parsed once and the
+    # C++ core splits the work across its own threads
+    worker = _make_batch_worker(
+        include_descriptors, include_fingerprints, radius, nbits, batch_size, packed
+    )
+    worker(smiles, *results.values())
 
-    # Initialize result arrays
-    results = {"valid": np.zeros(n_molecules, dtype=bool)}
+    if inverse is not None:
+        results = _scatter(results, inverse)
+    return results
 
-    if include_descriptors:
-        results.update(
-            {
-                "molecular_weight": np.full(n_molecules, np.nan),
-                "logp": np.full(n_molecules, np.nan),
-                "tpsa": np.full(n_molecules, np.nan),
-            }
+
+class BatchProcessor:
+    """
+    ``batch_process`` with result buffers allocated once and reused.
+
+    Meant for processing many chunks of at most ``capacity`` SMILES, e.g. from
+    a file reader: every ``process`` call writes into the same preallocated
+    arrays, so the steady state allocates no result memory and touches no
+    fresh pages. The arrays it returns are views into those buffers and are
+    overwritten by the next call; copy anything that must outlive it.
+
+    Args:
+        capacity: Maximum number of SMILES per ``process`` call
+        include_descriptors: Whether to calculate molecular descriptors
+        include_fingerprints: Whether to calculate fingerprints
+        radius: Fingerprint radius (if calculating fingerprints)
+        nbits: Fingerprint size (if calculating fingerprints)
+        dedup: Parse each distinct SMILES of a call only once (default:
+            True). The distinct results need a second set of buffers, so
+            this doubles the memory held.
+        packed: Produce bit-packed uint64 fingerprints (default: False)
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        include_descriptors: bool = True,
+        include_fingerprints: bool = False,
+        radius: int = 2,
+        nbits: int = 2048,
+        dedup: bool = True,
+        packed: bool = False,
+    ):
+        _check_extension()
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.dedup = dedup
+
+        allocate = functools.partial(
+            _allocate_results,
+            capacity,
+            include_descriptors,
+            include_fingerprints,
+            nbits,
+            packed,
+        )
+        self._results = allocate()
+        self._distinct = allocate() if dedup else None
+        self._worker = _make_batch_worker(
+            include_descriptors, include_fingerprints, radius, nbits, capacity, packed
         )
 
-    if include_fingerprints:
-        results["fingerprints"] = np.zeros((n_molecules, nbits), dtype=np.uint8)
+    def process(self, smiles) -> Dict[str, np.ndarray]:
+        """
+        Validate, describe and fingerprint up to ``capacity`` SMILES.
+
+        Args:
+            smiles: Array-like of SMILES strings
+
+        Returns:
+            Dictionary with the keys and values of ``batch_process``, as views
+            of the first ``len(smiles)`` rows of the internal buffers. They
+            are only valid until the next call.
+        """
+        smiles = _validate_smiles_input(smiles)
+        n = len(smiles)
+        if n > self.capacity:
+            raise ValueError(f"{n} SMILES exceed the capacity of {self.capacity}")
+
+        inverse = None
+        if self.dedup:
+            smiles, inverse = _deduplicate(smiles)
+        if inverse is None:
+            results = {key: buffer[:n] for key, buffer in self._results.items()}
+            self._worker(smiles, *results.values())
+            return results
+
+        distinct = {
+            key: buffer[: len(smiles)] for key, buffer in self._distinct.items()
+        }
+        self._worker(smiles, *distinct.values())
+        return {
+            key: _scatter(distinct[key], inverse, buffer[:n])
+            for key, buffer in self._results.items()
+        }
+
+
+def stream_batch_process(
+    smiles,
+    batch_size: int = 1000,
+    include_descriptors: bool = True,
+    include_fingerprints: bool = False,
+    radius: int = 2,
+    nbits: int = 2048,
+    dedup: bool = True,
+    packed: bool = False,
+    prefetch: int = 0,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Process SMILES batch by batch, yielding each batch's results.
 
-    # Process in batches
-    for i in range(0, n_molecules, batch_size):
-        end_idx = min(i + batch_size, n_molecules)
-        batch_smiles = smiles[i:end_idx]
+    Unlike ``batch_process`` nothing is accumulated, so peak memory is bounded
+    by ``prefetch + 1`` batches (``batch_size * nbits`` bytes of fingerprints
+    each) however many molecules are streamed, e.g. into a database or shard
+    writer.
 
-        # Validation
-        batch_valid = is_valid(batch_smiles)
-        results["valid"][i:end_idx] = batch_valid
+    Args:
+        smiles: Array-like of SMILES strings
+        batch_size: Number of molecules per yielded batch
+        include_descriptors: Whether to calculate molecular descriptors
+        include_fingerprints: Whether to calculate fingerprints
+        radius: Fingerprint radius (if calculating fingerprints)
+        nbits: Fingerprint size (if calculating fingerprints)
+        dedup: Parse each distinct SMILES within a batch only once
+            (default: True)
+        packed: Yield bit-packed uint64 fingerprints (default: False)
+        prefetch: Number of batches to compute ahead on a background thread
+            while the caller consumes the current one (default: 0, compute
+            each batch on demand). The core releases the GIL, so the caller's
+            Python work overlaps the next batch's parsing.
+
+    Yields:
+        Dictionaries with the same keys as ``batch_process`` covering
+        consecutive batches of the input, in order. Each batch's arrays are
+        freshly allocated, so they stay valid after the next batch is produced.
+    """
+    _check_extension()
+    smiles = _validate_smiles_input(smiles)
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+    if prefetch < 0:
+        raise ValueError("prefetch must be non-negative")
+    worker = _make_batch_worker(
+        include_descriptors, include_fingerprints, radius, nbits, batch_size, packed
+    )
 
-        if include_descriptors:
-            batch_desc = descriptors(batch_smiles)
-            results["molecular_weight"][i:end_idx] = batch_desc["molecular_weight"]
-            results["logp"][i:end_idx] = batch_desc["logp"]
-            results["tpsa"][i:end_idx] = batch_desc["tpsa"]
+    def compute(batch: np.ndarray) -> Dict[str, np.ndarray]:
+        inverse = None
+        if dedup:
+            batch, inverse = _deduplicate(batch)
+        results = _allocate_results(
+            len(batch), include_descriptors, include_fingerprints, nbits, packed
+        )
+        worker(batch, *results.values())
+        return results if inverse is None else _scatter(results, inverse)
 
-        if include_fingerprints:
-            batch_fps = morgan_fingerprints(batch_smiles, radius, nbits)
-            results["fingerprints"][i:end_idx] = batch_fps
+    batches = (
+        smiles[start : start + batch_size]
+        for start in range(0, len(smiles), batch_size)
+    )
+    if prefetch == 0:
+        for batch in batches:
+            yield compute(batch)
+        return
+
+    # One worker: each batch already uses every core thread, so batches are
+    # computed in order, ahead of the consumer
+    executor = ThreadPoolExecutor(max_workers=1)
+    pending = collections.deque()
+    try:
+        for batch in batches:
+            pending.append(executor.submit(compute, batch))
+            if len(pending) > prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Closing the generator early drops the batches not yet started
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Runtime configuration
+def set_num_threads(n: int) -> None:
+    """
+    Set the number of threads the batch functions parse molecules with.
 
-    return results
+    Every batch function releases the GIL and splits its molecules across
+    these OpenMP threads. The initial value comes from the
+    ``RDKTOOLS_NUM_THREADS`` environment variable, falling back to one
+    thread per core. While any batch runs, RDKit's process-wide logging is
+    blocked, including for RDKit calls made from other threads.
+
+    Args:
+        n: Thread count; values below 1 restore the default
+    """
+    _check_extension()
+    _rdktools_core.set_num_threads(n)
+
+
+def get_num_threads() -> int:
+    """Number of threads the batch functions use (1 without OpenMP)."""
+    _check_extension()
+    return _rdktools_core.get_num_threads()
+
+
+def get_isa_tier() -> str:
+    """
+    Instruction set used by the similarity kernels on this CPU.
+
+    Chosen once, when the extension is imported: ``"avx512_vpopcntdq"``,
+    ``"avx2"``, ``"popcnt"`` or ``"scalar"``. Useful to record alongside
+    benchmark results.
+    """
+    _check_extension()
+    return _rdktools_core.popcount_backend()
+
+
+def set_cache_size(n: int) -> None:
+    """
+    Set how many distinct SMILES the descriptor cache remembers.
+
+    Descriptor functions look each SMILES string up in a process-wide LRU
+    cache before parsing it, so compounds repeated across calls are not
+    re-parsed. SMILES are compared byte for byte, not canonicalized. The cache
+    never holds more than ``n`` entries; it is split into hash stripes with
+    their own LRU order, so an entry can be evicted before the whole cache
+    is full.
+
+    Args:
+        n: Maximum number of cached SMILES (default 65536); 0 disables the
+            cache and frees its entries
+    """
+    _check_extension()
+    if n < 0:
+        raise ValueError("cache size must be non-negative")
+    _rdktools_core.set_cache_size(n)
+
+
+def get_cache_size() -> int:
+    """Maximum number of SMILES the descriptor cache remembers (0 if disabled)."""
+    _check_extension()
+    return _rdktools_core.get_cache_size()
+
+
+def clear_cache() -> None:
+    """Drop every entry from the descriptor cache."""
+    _check_extension()
+    _rdktools_core.clear_cache()
 
 
 # TensorFlow ops (optional)
@@ -315,13 +980,31 @@ __all__ = [
     "logp",
     "tpsa",
     "is_valid",
+    "is_valid_packed",
     "canonical_smiles",
+    "canonical_smiles_arrow",
     "descriptors",
+    "descriptors_matrix",
+    "DESCRIPTOR_NAMES",
     "morgan_fingerprints",
+    "pack_fingerprints",
+    "tanimoto",
+    "bulk_tanimoto",
+    "tanimoto_matrix",
+    "tanimoto_topk",
+    "unpack_fingerprints",
     "ecfp_reasoning_trace",
     "ECFP_REASONING_FINGERPRINT_SIZE",
     "filter_valid",
     "batch_process",
+    "BatchProcessor",
+    "stream_batch_process",
+    "set_num_threads",
+    "get_num_threads",
+    "get_isa_tier",
+    "set_cache_size",
+    "get_cache_size",
+    "clear_cache",
 ]
 
 # Add TensorFlow ops to exports if available
@@ -0,0 +1,270 @@
+"""
+Similarity helpers for bit-packed fingerprints.
+
+Fingerprints produced by ``morgan_fingerprints(..., packed=True)`` store bit
+``j`` in word ``j // 64`` at bit position ``j % 64``. Similarities are computed
+directly on those uint64 words with a population count, so no per-bit
+expansion is ever materialised.
+
+When the C++ extension is built, ``tanimoto_matrix`` and ``tanimoto_topk`` run
+on its SIMD popcount kernels, picked at import for the running CPU.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+try:
+    from . import _rdktools_core
+
+    _CORE_AVAILABLE = True
+except ImportError:
+    _CORE_AVAILABLE = False
+
+try:
+    import numba
+    from numba import types
+    from numba.extending import intrinsic
+
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+# np.bitwise_count (NumPy >= 2.0) lowers to the hardware POPCNT instruction
+_HAS_BITWISE_COUNT = hasattr(np, "bitwise_count")
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Count set bits over the last axis of a uint64 array."""
+    if _HAS_BITWISE_COUNT:
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def _as_packed(fps) -> np.ndarray:
+    """Validate a packed fingerprint array."""
+    fps = np.asarray(fps)
+    if fps.dtype != np.uint64:
+        raise TypeError(
+            "Packed fingerprints must be uint64; use "
+            "morgan_fingerprints(..., packed=True)"
+        )
+    return fps
+
+
+def unpack_fingerprints(fps, nbits: Optional[int] = None) -> np.ndarray:
+    """
+    Expand bit-packed fingerprints to one uint8 per bit.
+
+    Args:
+        fps: uint64 array of packed fingerprints, shape (..., n_words)
+        nbits: Fingerprint length in bits, at most 64 * n_words. Defaults to
+            64 * n_words, which is exact for multiples of 64 such as 2048.
+
+    Returns:
+        uint8 array of shape (..., nbits) holding 0 or 1, matching
+        ``morgan_fingerprints(..., packed=False)``.
+    """
+    fps = _as_packed(fps)
+    if nbits is None:
+        nbits = 64 * fps.shape[-1]
+    if nbits > 64 * fps.shape[-1]:
+        raise ValueError(f"nbits={nbits} exceeds the {64 * fps.shape[-1]} packed bits")
+    # Little-endian words put bit j of each word in byte j // 8, bit j % 8
+    as_bytes = np.ascontiguousarray(fps, dtype="<u8").view(np.uint8)
+    return np.unpackbits(as_bytes, axis=-1, count=nbits, bitorder="little")
+
+
+def pack_fingerprints(fps) -> np.ndarray:
+    """
+    Pack one-uint8-per-bit fingerprints into uint64 words.
+
+    The inverse of ``unpack_fingerprints``, for bringing fingerprints computed
+    elsewhere (for example with RDKit directly) into the packed layout.
+
+    Args:
+        fps: Array of 0/1 (or boolean) bits, shape (..., nbits)
+
+    Returns:
+        uint64 array of shape (..., ceil(nbits / 64)), matching
+        ``morgan_fingerprints(..., packed=True)``.
+    """
+    fps = np.asarray(fps)
+    nbits = fps.shape[-1]
+    n_words = -(-nbits // 64)
+    bits = np.zeros(fps.shape[:-1] + (64 * n_words,), dtype=np.uint8)
+    np.not_equal(fps, 0, out=bits[..., :nbits], casting="unsafe")
+    as_bytes = np.packbits(bits, axis=-1, bitorder="little")
+    return as_bytes.view("<u8").astype(np.uint64, copy=False)
+
+
+def tanimoto(fps_a, fps_b):
+    """
+    Tanimoto similarity between bit-packed fingerprints.
+
+    Args:
+        fps_a: uint64 array of packed fingerprints, shape (..., n_words)
+        fps_b: uint64 array of packed fingerprints broadcastable against fps_a
+
+    Returns:
+        Similarities over the last axis with the broadcast leading shape: a
+        float for two single fingerprints, or a float64 array otherwise.
+        Pairs with no bits set in either fingerprint have similarity 0.0.
+    """
+    fps_a = _as_packed(fps_a)
+    fps_b = _as_packed(fps_b)
+
+    intersection = _popcount(np.bitwise_and(fps_a, fps_b))
+    union = _popcount(np.bitwise_or(fps_a, fps_b))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarity = np.where(union > 0, intersection / union, 0.0)
+
+    return float(similarity) if similarity.ndim == 0 else similarity
+
+
+# Rows of fps_a per step of the NumPy fallback, bounding its temporaries
+_FALLBACK_BLOCK_ROWS = 64
+
+if _NUMBA_AVAILABLE:
+
+    @intrinsic
+    def _ctpop(typingctx, word):
+        """Population count of a uint64 via llvm.ctpop (hardware POPCNT)."""
+        sig = types.int64(types.uint64)
+
+        def codegen(context, builder, signature, args):
+            return builder.ctpop(args[0])
+
+        return sig, codegen
+
+    # The explicit signature compiles eagerly at import and, with cache=True,
+    # later imports load the machine code from __pycache__ instead of JITting
+    @numba.njit(
+        "float64[:, ::1](uint64[:, ::1], uint64[:, ::1])",
+        parallel=True,
+        cache=True,
+        fastmath=True,
+    )
+    def _tanimoto_matrix_kernel(fps_a, fps_b):
+        n_a, n_words = fps_a.shape
+        n_b = fps_b.shape[0]
+        similarity = np.empty((n_a, n_b), dtype=np.float64)
+        for i in numba.prange(n_a):
+            for j in range(n_b):
+                intersection = 0
+                union = 0
+                for k in range(n_words):
+                    intersection += _ctpop(fps_a[i, k] & fps_b[j, k])
+                    union += _ctpop(fps_a[i, k] | fps_b[j, k])
+                similarity[i, j] = intersection / union if union > 0 else 0.0
+        return similarity
+
+
+def _tanimoto_matrix_numpy(fps_a: np.ndarray, fps_b: np.ndarray) -> np.ndarray:
+    """Blocked NumPy fallback for tanimoto_matrix when Numba is unavailable."""
+    similarity = np.empty((len(fps_a), len(fps_b)), dtype=np.float64)
+    for start in range(0, len(fps_a), _FALLBACK_BLOCK_ROWS):
+        block = fps_a[start : start + _FALLBACK_BLOCK_ROWS, None, :]
+        similarity[start : start + len(block)] = tanimoto(block, fps_b[None, :, :])
+    return similarity
+
+
+def _as_packed_pair(fps_a, fps_b, caller: str):
+    """Validate two 2D packed fingerprint arrays of equal width."""
+    fps_a = np.ascontiguousarray(_as_packed(fps_a))
+    fps_b = np.ascontiguousarray(_as_packed(fps_b))
+    if fps_a.ndim != 2 or fps_b.ndim != 2:
+        raise ValueError(f"{caller} expects 2D fingerprint arrays")
+    if fps_a.shape[1] != fps_b.shape[1]:
+        raise ValueError(
+            f"Fingerprint widths differ: {fps_a.shape[1]} vs {fps_b.shape[1]} words"
+        )
+    return fps_a, fps_b
+
+
+def tanimoto_matrix(fps_a, fps_b) -> np.ndarray:
+    """
+    All-pairs Tanimoto similarity between two sets of bit-packed fingerprints.
+
+    Uses the C++ extension's SIMD kernel when it is built, then a parallel
+    Numba kernel when Numba is installed, and a blocked NumPy implementation
+    otherwise.
+
+    Args:
+        fps_a: uint64 array of packed fingerprints, shape (n_a, n_words)
+        fps_b: uint64 array of packed fingerprints, shape (n_b, n_words)
+
+    Returns:
+        float64 array of shape (n_a, n_b) where element ``[i, j]`` is the
+        similarity of ``fps_a[i]`` and ``fps_b[j]``.
+    """
+    fps_a, fps_b = _as_packed_pair(fps_a, fps_b, "tanimoto_matrix")
+
+    if _CORE_AVAILABLE:
+        return _rdktools_core.tanimoto_matrix(fps_a, fps_b)
+    if _NUMBA_AVAILABLE:
+        return _tanimoto_matrix_kernel(fps_a, fps_b)
+    return _tanimoto_matrix_numpy(fps_a, fps_b)
+
+
+def bulk_tanimoto(query, fps) -> np.ndarray:
+    """
+    Tanimoto similarity of one bit-packed fingerprint against many.
+
+    A screening convenience over ``tanimoto_matrix`` with a single query row,
+    so it runs on the same kernel.
+
+    Args:
+        query: uint64 array of one packed fingerprint, shape (n_words,)
+        fps: uint64 array of packed fingerprints, shape (n, n_words)
+
+    Returns:
+        float64 array of shape (n,) where element ``i`` is the similarity of
+        ``query`` and ``fps[i]``.
+    """
+    query = _as_packed(query)
+    if query.ndim != 1:
+        raise ValueError("bulk_tanimoto expects a single 1D query fingerprint")
+    return tanimoto_matrix(query[None, :], fps)[0]
+
+
+def tanimoto_topk(queries, database, k: int):
+    """
+    Nearest neighbours by Tanimoto similarity over bit-packed fingerprints.
+
+    With the C++ extension each query keeps only its best k hits, so the full
+    (n_queries, n_database) similarity matrix is never stored.
+
+    Args:
+        queries: uint64 array of packed fingerprints, shape (n_queries, n_words)
+        database: uint64 array of packed fingerprints, shape (n_database, n_words)
+        k: Number of neighbours per query; capped at n_database
+
+    Returns:
+        Tuple ``(indices, scores)`` of shape (n_queries, k): int64 rows of
+        ``database`` and their float64 similarities, most similar first. Ties
+        keep the lower database index first.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    queries, database = _as_packed_pair(queries, database, "tanimoto_topk")
+
+    if _CORE_AVAILABLE:
+        return _rdktools_core.tanimoto_topk(queries, database, k)
+
+    similarity = tanimoto_matrix(queries, database)
+    indices = np.argsort(-similarity, axis=1, kind="stable")[:, :k]
+    return indices.astype(np.int64), np.take_along_axis(similarity, indices, axis=1)
+
+
+__all__ = [
+    "bulk_tanimoto",
+    "pack_fingerprints",
+    "tanimoto",
+    "tanimoto_matrix",
+    "tanimoto_topk",
+    "unpack_fingerprints",
+]
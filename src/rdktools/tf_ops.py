@@ -6,8 +6,10 @@ These operations can be used to process molecular data efficiently within
 TensorFlow graphs and tf.data pipelines.
 """
 
+import functools
+import itertools
 import os
-from typing import Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
 import tensorflow as tf
@@ -85,9 +87,10 @@ def string_process(
         >>> print(traces.numpy()[0])
         >>> print(fps.numpy()[0].shape)
         
-        # Use in a tf.data pipeline
+        # Use in a tf.data pipeline; batching first lets each op call
+        # process a whole batch
         >>> dataset = tf.data.Dataset.from_tensor_slices(["CCO", "c1ccccc1"])
-        >>> dataset = dataset.map(string_process)
+        >>> dataset = dataset.batch(2).map(string_process)
         >>> for traces, fps in dataset.take(1):
         ...     print(traces.numpy()[0], fps.numpy()[0].sum())
     """
@@ -102,6 +105,37 @@ def string_process(
     )
 
 
+@functools.lru_cache(maxsize=None)
+def string_process_function(fingerprint_size: int = 2048):
+    """
+    A graph-compiled ``string_process`` for one fingerprint size.
+
+    The returned ``tf.function`` takes a 1-D string tensor of any length and
+    is traced once per fingerprint size, so repeated eager calls (and any
+    reductions the caller wraps around it in its own ``tf.function``) skip
+    the Python dispatch of ``string_process``. XLA compilation is not
+    offered: the op runs RDKit on the host and has no XLA kernel.
+
+    Args:
+        fingerprint_size: Desired fingerprint length in bits. Non-positive
+            values fall back to the default of 2048.
+
+    Returns:
+        Callable mapping a ``[None]`` string tensor to ``(traces, fingerprints)``.
+    """
+    _check_tf_ops()
+
+    if not isinstance(fingerprint_size, int):
+        raise TypeError("fingerprint_size must be an int")
+    size = fingerprint_size if fingerprint_size > 0 else 2048
+
+    @tf.function(input_signature=[tf.TensorSpec(shape=[None], dtype=tf.string)])
+    def process(input_strings):
+        return _tf_ops_module.string_process(input_strings, fingerprint_size=size)
+
+    return process
+
+
 def formula_process(
     input_strings: tf.Tensor,
     name: Optional[str] = None,
@@ -121,6 +155,16 @@ def formula_process(
     return _tf_ops_module.formula_process(input_strings, name=name)
 
 
+def _chunked(smiles: Iterable, batch_size: int) -> Iterator[List]:
+    """Yield lists of up to batch_size items from an iterable."""
+    iterator = iter(smiles)
+    while True:
+        chunk = list(itertools.islice(iterator, batch_size))
+        if not chunk:
+            return
+        yield chunk
+
+
 def create_tf_dataset_op(
     smiles,
     *,
@@ -129,6 +173,7 @@ def create_tf_dataset_op(
     shuffle_buffer_size: Optional[int] = None,
     prefetch: bool = True,
     fingerprint_size: int = 2048,
+    stream: bool = False,
 ) -> tf.data.Dataset:
     """
     Convenience helper that builds a tf.data pipeline backed by the custom op.
@@ -141,6 +186,11 @@ def create_tf_dataset_op(
         prefetch: Whether to add a `prefetch(tf.data.AUTOTUNE)` stage.
         fingerprint_size: Desired fingerprint length for the op. Non-positive
             values fall back to 2048.
+        stream: Read iterables other than lists, tuples and arrays lazily
+            through ``tf.data.Dataset.from_generator``, one batch per Python
+            callback. By default they are materialised into a string tensor
+            up front, which keeps the pipeline out of Python entirely; only
+            stream inputs that do not fit in memory.
 
     Returns:
         Configured tf.data.Dataset yielding batches of `(traces, fingerprints)`
@@ -152,21 +202,20 @@ def create_tf_dataset_op(
         smiles = tf.constant(smiles, dtype=tf.string)
     elif isinstance(smiles, np.ndarray):
         smiles = tf.constant(smiles.astype(str), dtype=tf.string)
+    elif not isinstance(smiles, tf.Tensor) and not stream:
+        smiles = tf.constant(list(smiles), dtype=tf.string)
 
+    batched = False
     if isinstance(smiles, tf.Tensor):
         dataset = tf.data.Dataset.from_tensor_slices(smiles)
     else:
+        # Yielding whole batches crosses into Python once per batch rather
+        # than once per SMILES string
         dataset = tf.data.Dataset.from_generator(
-            lambda: smiles,
-            output_signature=tf.TensorSpec(shape=(), dtype=tf.string),
+            lambda: _chunked(smiles, batch_size),
+            output_signature=tf.TensorSpec(shape=(None,), dtype=tf.string),
         )
-
-    dataset = dataset.map(
-        lambda value: string_process(
-            value, fingerprint_size=fingerprint_size
-        ),
-        num_parallel_calls=tf.data.AUTOTUNE,
-    )
+        batched = True
 
     if shuffle:
         if shuffle_buffer_size is None:
@@ -176,9 +225,22 @@ def create_tf_dataset_op(
                 raise ValueError(
                     "shuffle_buffer_size must be provided when using generators"
                 ) from None
+        if batched:
+            dataset = dataset.unbatch()
+            batched = False
         dataset = dataset.shuffle(shuffle_buffer_size)
 
-    dataset = dataset.batch(batch_size)
+    # Batch before mapping so the op runs once per batch of SMILES, sharding
+    # the batch over its worker threads, instead of once per scalar string.
+    # Shuffling the raw strings also keeps the shuffle buffer small.
+    if not batched:
+        dataset = dataset.batch(batch_size)
+    dataset = dataset.map(
+        lambda values: string_process(
+            values, fingerprint_size=fingerprint_size
+        ),
+        num_parallel_calls=tf.data.AUTOTUNE,
+    )
 
     if prefetch:
         dataset = dataset.prefetch(tf.data.AUTOTUNE)
@@ -188,6 +250,7 @@ def create_tf_dataset_op(
 # Export public API
 __all__ = [
     "string_process",
+    "string_process_function",
     "formula_process",
     "create_tf_dataset_op",
 ]
@@ -78,7 +78,25 @@ class TestBasicFunctions:
         assert valid[1] == False  # invalid
         assert valid[2] == True   # benzene
         assert valid[3] == False  # bad_smiles
-    
+
+        for dedup in (True, False):
+            packed = rdktools.is_valid_packed(np.tile(smiles, 20), dedup=dedup)
+            assert packed.dtype == np.uint64 and packed.shape == (2,)
+            unpacked = rdktools.unpack_fingerprints(packed, 80).astype(bool)
+            npt.assert_array_equal(unpacked, np.tile([True, False, True, False], 20))
+
+        # Pre-parse charset rejection, with names after whitespace left to RDKit
+        valid = rdktools.is_valid(np.array(['C_C', 'CCO ethanol', '[Cu+2]', 'C%10CC%10']))
+        npt.assert_array_equal(valid, [False, True, True, True])
+
+        # Leading whitespace does not hide garbage from the charset check
+        valid = rdktools.is_valid(np.array(['  CCO', '  bad_smiles', '\tC_C name']))
+        npt.assert_array_equal(valid, [True, False, False])
+
+        # CXSMILES extensions after the whitespace are left to RDKit
+        valid = rdktools.is_valid(np.array(['C[C@H](O)CC |&1:1|', 'CCO |$;;$|', 'c1ccccc1 |c:0|']))
+        npt.assert_array_equal(valid, [True, True, True])
+
     def test_canonical_smiles(self):
         """Test SMILES canonicalization."""
         smiles = np.array(['CCO', 'OCC'])  # different representations of ethanol
@@ -93,6 +111,25 @@ class TestBasicFunctions:
         # Both should give the same canonical form
         assert canonical_list[0] == canonical_list[1]
 
+        as_bytes = rdktools.canonical_smiles(smiles, as_bytes=True)
+        assert as_bytes.dtype == object
+        assert [item.decode() for item in as_bytes] == canonical_list
+
+    def test_canonical_smiles_arrow(self):
+        """Test the contiguous buffer matches the object-array result."""
+        smiles = np.array(['OCC', 'invalid', 'c1ccccc1', 'CCO', 'OCC'])
+        expected = rdktools.canonical_smiles(smiles, as_bytes=True)
+
+        for dedup in (True, False):
+            data, offsets = rdktools.canonical_smiles_arrow(smiles, dedup=dedup)
+            assert data.dtype == np.uint8 and offsets.dtype == np.int64
+            assert offsets[0] == 0 and offsets[-1] == len(data)
+            decoded = [
+                data[start:end].tobytes()
+                for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+            assert decoded == list(expected)
+
 
 class TestBatchOperations:
     """Test batch processing functions."""
@@ -111,7 +148,34 @@ class TestBatchOperations:
         for key in ['molecular_weight', 'logp', 'tpsa']:
             assert len(results[key]) == 3
             assert results[key].dtype == np.float64
-    
+
+    def test_descriptors_matrix(self):
+        """Test the (n, 3) descriptor matrix matches the dict columns."""
+        smiles = np.array(['CCO', 'c1ccccc1', 'invalid', 'CC(=O)O'])
+        matrix = rdktools.descriptors_matrix(smiles, dedup=False)
+        results = rdktools.descriptors(smiles)
+
+        assert matrix.shape == (4, 3)
+        assert matrix.dtype == np.float64
+        assert matrix.T.flags.c_contiguous
+        for column, key in enumerate(rdktools.DESCRIPTOR_NAMES):
+            npt.assert_array_equal(matrix[:, column], results[key])
+        assert np.isnan(matrix[2]).all()
+
+    def test_descriptor_block_alignment(self):
+        """Test descriptor rows share one aligned block, with and without dedup."""
+        smiles = np.array(['CCO', 'c1ccccc1', 'CCO', 'CC(=O)O', 'CCO'])
+        for dedup in (True, False):
+            matrix = rdktools.descriptors_matrix(smiles, dedup=dedup)
+            assert matrix.T.flags.c_contiguous
+            assert matrix.ctypes.data % 64 == 0
+
+            results = rdktools.descriptors(smiles, dedup=dedup)
+            base = results['molecular_weight'].ctypes.data
+            assert base % 64 == 0
+            for row, key in enumerate(rdktools.DESCRIPTOR_NAMES):
+                assert results[key].ctypes.data == base + row * len(smiles) * 8
+
     def test_filter_valid(self):
         """Test filtering to valid SMILES only."""
         smiles = np.array(['CCO', 'invalid', 'c1ccccc1'])
@@ -121,7 +185,46 @@ class TestBatchOperations:
         assert 'CCO' in valid_smiles
         assert 'c1ccccc1' in valid_smiles
         assert 'invalid' not in valid_smiles
+
+        filtered, mask = rdktools.filter_valid(smiles, return_mask=True)
+        assert list(filtered) == list(valid_smiles)
+        npt.assert_array_equal(mask, [True, False, True])
+
+        # Object inputs are compacted by reference, keeping the input order
+        objects = np.array(['c1ccccc1', 'bad_smiles', 'CCO', 'invalid'], dtype=object)
+        filtered = rdktools.filter_valid(objects)
+        assert filtered.dtype == object
+        assert filtered[0] is objects[0] and filtered[1] is objects[2]
     
+    def test_deduplicate(self):
+        """Distinct SMILES keep first-occurrence order and map back exactly."""
+        for dtype in (object, str):
+            smiles = np.array(['CCO', 'N', 'CCO', 'C', 'N'], dtype=dtype)
+            unique, inverse = rdktools._deduplicate(smiles)
+            assert list(unique) == ['CCO', 'N', 'C']
+            npt.assert_array_equal(unique[inverse], smiles)
+
+        distinct = np.array(['CCO', 'N'], dtype=object)
+        unique, inverse = rdktools._deduplicate(distinct)
+        assert unique is distinct and inverse is None
+
+    def test_descriptors_out(self):
+        """Test descriptors and validity written into preallocated views."""
+        smiles = np.array(['CCO', 'invalid', 'CCO'])
+        expected = rdktools.descriptors(smiles)
+
+        for dedup in (True, False):
+            block = np.zeros((3, 5))
+            out = dict(zip(rdktools.DESCRIPTOR_NAMES, block[:, 1:4]))
+            assert rdktools.descriptors(smiles, out=out, dedup=dedup) is out
+            for key in rdktools.DESCRIPTOR_NAMES:
+                npt.assert_array_equal(out[key], expected[key])
+            assert not block[:, 0].any() and not block[:, 4].any()
+
+            valid = np.empty(3, dtype=bool)
+            assert rdktools.is_valid(smiles, out=valid, dedup=dedup) is valid
+            npt.assert_array_equal(valid, [True, False, True])
+
     def test_batch_process(self):
         """Test comprehensive batch processing."""
         smiles = np.array(['CCO', 'c1ccccc1', 'invalid', 'CC(=O)O'])
@@ -151,6 +254,168 @@ class TestBatchOperations:
         assert results['valid'][2] == False  # invalid
         assert results['valid'][3] == True   # acetic acid
 
+        # Outputs start uninitialised, so the core must fill invalid rows
+        assert not results['fingerprints'][2].any()
+        for key in rdktools.DESCRIPTOR_NAMES:
+            assert np.isnan(results[key][2])
+        npt.assert_array_equal(
+            results['fingerprints'], rdktools.morgan_fingerprints(smiles, nbits=512)
+        )
+
+    def test_batch_process_packed(self):
+        """Packed batch fingerprints match morgan_fingerprints(packed=True)."""
+        smiles = np.array(['CCO', 'invalid', 'c1ccccc1'])
+
+        results = rdktools.batch_process(
+            smiles, include_fingerprints=True, nbits=100, packed=True
+        )
+        packed = results['fingerprints']
+        assert packed.dtype == np.uint64
+        assert packed.shape == (3, 2)
+        npt.assert_array_equal(
+            packed, rdktools.morgan_fingerprints(smiles, nbits=100, packed=True)
+        )
+        npt.assert_array_equal(
+            rdktools.unpack_fingerprints(packed, 100),
+            rdktools.morgan_fingerprints(smiles, nbits=100),
+        )
+
+    def test_num_threads(self):
+        """Results do not depend on the thread count."""
+        smiles = np.array(['CCO', 'invalid', 'c1ccccc1', 'CC(=O)O'] * 50)
+        default = rdktools.get_num_threads()
+        capacity = rdktools.get_cache_size()
+        try:
+            # Without the cache the parallel run parses again on the threads
+            rdktools.set_cache_size(0)
+            rdktools.set_num_threads(1)
+            assert rdktools.get_num_threads() == 1
+            serial = rdktools.batch_process(smiles, include_fingerprints=True, dedup=False)
+            rdktools.set_num_threads(0)
+            assert rdktools.get_num_threads() == default
+            parallel = rdktools.batch_process(
+                smiles, include_fingerprints=True, dedup=False
+            )
+        finally:
+            rdktools.set_num_threads(0)
+            rdktools.set_cache_size(capacity)
+
+        for key, values in serial.items():
+            npt.assert_array_equal(parallel[key], values)
+
+    def test_descriptor_functions_num_threads(self):
+        """Per-descriptor kernels give the same results on one or many threads."""
+        smiles = np.array(['CCO', 'invalid', 'c1ccccc1', 'CC(=O)O', 'CCN'] * 40)
+        functions = (
+            rdktools.molecular_weights,
+            rdktools.logp,
+            rdktools.tpsa,
+            rdktools.descriptors_matrix,
+        )
+        capacity = rdktools.get_cache_size()
+        try:
+            # Without the cache every call parses again on the threads
+            rdktools.set_cache_size(0)
+            rdktools.set_num_threads(1)
+            serial = [fn(smiles, dedup=False) for fn in functions]
+            rdktools.set_num_threads(0)
+            parallel = [fn(smiles, dedup=False) for fn in functions]
+        finally:
+            rdktools.set_num_threads(0)
+            rdktools.set_cache_size(capacity)
+
+        for expected, values in zip(serial, parallel):
+            npt.assert_array_equal(values, expected)
+
+    def test_descriptor_cache(self):
+        """Cached descriptors match freshly computed ones."""
+        smiles = np.array(['CCO', 'invalid', 'c1ccccc1'])
+        capacity = rdktools.get_cache_size()
+        try:
+            rdktools.set_cache_size(0)
+            uncached = rdktools.descriptors_matrix(smiles)
+            rdktools.set_cache_size(1024)
+            assert rdktools.get_cache_size() == 1024
+            rdktools.clear_cache()
+            first = rdktools.descriptors_matrix(smiles)
+            second = rdktools.descriptors_matrix(smiles)
+            batched = rdktools.batch_process(smiles, include_fingerprints=True)
+        finally:
+            rdktools.set_cache_size(capacity)
+
+        npt.assert_array_equal(first, uncached)
+        npt.assert_array_equal(second, uncached)
+        for column, name in enumerate(rdktools.DESCRIPTOR_NAMES):
+            npt.assert_array_equal(batched[name], uncached[:, column])
+        with pytest.raises(ValueError):
+            rdktools.set_cache_size(-1)
+
+    def test_single_descriptor_cache(self):
+        """Single-descriptor misses do not leave partial triples in the cache."""
+        smiles = np.array(['CCO', 'invalid', 'c1ccccc1'])
+        capacity = rdktools.get_cache_size()
+        try:
+            rdktools.set_cache_size(0)
+            expected = rdktools.descriptors_matrix(smiles)
+            rdktools.set_cache_size(1024)
+            rdktools.clear_cache()
+            weights = rdktools.molecular_weights(smiles)
+            matrix = rdktools.descriptors_matrix(smiles)
+            tpsa = rdktools.tpsa(smiles)
+        finally:
+            rdktools.set_cache_size(capacity)
+
+        npt.assert_array_equal(weights, expected[:, 0])
+        npt.assert_array_equal(matrix, expected)
+        npt.assert_array_equal(tpsa, expected[:, 2])
+
+    def test_batch_processor_reuses_buffers(self):
+        """BatchProcessor matches batch_process while reusing its buffers."""
+        chunks = [
+            np.array(['CCO', 'c1ccccc1', 'invalid', 'CCO', 'CC(=O)O']),
+            np.array(['CCN', 'invalid', 'CCO']),
+        ]
+
+        # Later chunks overwrite rows left over from earlier ones
+        for packed in (False, True):
+            kwargs = dict(include_fingerprints=True, nbits=256, packed=packed)
+            processor = rdktools.BatchProcessor(capacity=5, **kwargs)
+            for chunk in chunks:
+                results = processor.process(chunk)
+                expected = rdktools.batch_process(chunk, **kwargs)
+                assert results.keys() == expected.keys()
+                for key, values in expected.items():
+                    npt.assert_array_equal(results[key], values)
+                assert np.shares_memory(results['valid'], processor._results['valid'])
+
+        with pytest.raises(ValueError):
+            processor.process(np.array(['CCO'] * 6))
+
+    def test_stream_batch_process(self):
+        """Streamed batches concatenate to the batch_process result."""
+        smiles = np.array(['CCO', 'c1ccccc1', 'invalid', 'CC(=O)O', 'CCO'])
+        kwargs = dict(include_fingerprints=True, nbits=512)
+
+        batches = list(rdktools.stream_batch_process(smiles, batch_size=2, **kwargs))
+        assert [len(batch['valid']) for batch in batches] == [2, 2, 1]
+
+        expected = rdktools.batch_process(smiles, **kwargs)
+        for key, values in expected.items():
+            streamed = np.concatenate([batch[key] for batch in batches])
+            npt.assert_array_equal(streamed, values)
+
+        # Prefetched batches arrive in the same order with the same values
+        for prefetch in (1, 3):
+            prefetched = list(
+                rdktools.stream_batch_process(
+                    smiles, batch_size=2, prefetch=prefetch, **kwargs
+                )
+            )
+            assert len(prefetched) == len(batches)
+            for batch, expected_batch in zip(prefetched, batches):
+                for key, values in expected_batch.items():
+                    npt.assert_array_equal(batch[key], values)
+
 
 class TestFingerprints:
     """Test fingerprint calculations."""
@@ -190,25 +455,356 @@ class TestFingerprints:
         assert fp_512.shape == (1, 512)
         assert fp_1024.shape == (1, 1024)
     
+    def test_morgan_fingerprints_out_buffer(self):
+        """Test writing fingerprints into a preallocated array slice."""
+        smiles = np.array(['CCO', 'c1ccccc1'])
+        expected = rdktools.morgan_fingerprints(smiles, radius=2, nbits=256)
+
+        buffer = np.zeros((4, 256), dtype=np.uint8)
+        result = rdktools.morgan_fingerprints(
+            smiles, radius=2, nbits=256, out=buffer[1:3]
+        )
+
+        npt.assert_array_equal(result, expected)
+        npt.assert_array_equal(buffer[1:3], expected)
+        assert not buffer[0].any() and not buffer[3].any()
+
+        weights = np.empty(2)
+        assert rdktools.molecular_weights(smiles, out=weights) is weights
+        npt.assert_array_equal(weights, rdktools.molecular_weights(smiles))
+
+    def test_morgan_fingerprints_sparse(self):
+        """Test CSR fingerprints hold exactly the dense set bits."""
+        pytest.importorskip('scipy')
+        smiles = np.array(['CCO', 'invalid', 'c1ccccc1', 'CCO'])
+
+        for dedup in (True, False):
+            matrix = rdktools.morgan_fingerprints(
+                smiles, radius=3, nbits=4096, sparse=True, dedup=dedup
+            )
+            assert matrix.shape == (4, 4096)
+            assert matrix.dtype == np.uint8
+            assert matrix[1].nnz == 0
+            npt.assert_array_equal(
+                matrix.toarray(),
+                rdktools.morgan_fingerprints(smiles, radius=3, nbits=4096),
+            )
+
+        with pytest.raises(ValueError):
+            rdktools.morgan_fingerprints(smiles, sparse=True, packed=True)
+
+    def test_morgan_fingerprints_packed(self):
+        """Test bit-packed fingerprints match the per-bit layout."""
+        smiles = np.array(['CCO', 'c1ccccc1', 'invalid'])
+        fps = rdktools.morgan_fingerprints(smiles, radius=2, nbits=1024)
+        packed = rdktools.morgan_fingerprints(
+            smiles, radius=2, nbits=1024, packed=True
+        )
+
+        assert packed.shape == (3, 1024 // 64)
+        assert packed.dtype == np.uint64
+
+        unpacked = np.unpackbits(packed.view(np.uint8), axis=1, bitorder='little')
+        npt.assert_array_equal(unpacked, fps)
+        npt.assert_array_equal(rdktools.unpack_fingerprints(packed, 1024), fps)
+        npt.assert_array_equal(rdktools.unpack_fingerprints(packed), fps)
+        npt.assert_array_equal(rdktools.pack_fingerprints(fps), packed)
+
+        assert rdktools.tanimoto(packed[0], packed[0]) == 1.0
+        assert rdktools.tanimoto(packed[2], packed[2]) == 0.0
+
+    def test_tanimoto_matrix(self):
+        """Test the all-pairs similarity matrix against pairwise Tanimoto."""
+        smiles = np.array(['CCO', 'c1ccccc1', 'CC(=O)O', 'invalid'])
+        packed = rdktools.morgan_fingerprints(smiles, nbits=512, packed=True)
+
+        matrix = rdktools.tanimoto_matrix(packed, packed[:2])
+
+        assert matrix.shape == (4, 2)
+        npt.assert_allclose(
+            matrix, rdktools.tanimoto(packed[:, None, :], packed[None, :2, :])
+        )
+        npt.assert_array_equal(np.diag(matrix[:2]), [1.0, 1.0])
+
+    def test_tanimoto_topk(self):
+        """Test top-k search against sorting the full similarity matrix."""
+        smiles = np.array(['CCO', 'c1ccccc1', 'CC(=O)O', 'CCN', 'invalid'])
+        packed = rdktools.morgan_fingerprints(smiles, nbits=512, packed=True)
+
+        indices, scores = rdktools.tanimoto_topk(packed[:3], packed, k=2)
+
+        assert indices.shape == scores.shape == (3, 2)
+        assert indices.dtype == np.int64
+        npt.assert_array_equal(indices[:, 0], [0, 1, 2])
+        npt.assert_array_equal(scores[:, 0], [1.0, 1.0, 1.0])
+
+        matrix = rdktools.tanimoto_matrix(packed[:3], packed)
+        npt.assert_allclose(scores, np.sort(matrix, axis=1)[:, ::-1][:, :2])
+
+        indices, _ = rdktools.tanimoto_topk(packed[:1], packed, k=10)
+        assert indices.shape == (1, len(smiles))
+
+    def test_bulk_tanimoto(self):
+        """Test one-against-many similarity against the full matrix."""
+        smiles = np.array(['CCO', 'c1ccccc1', 'CC(=O)O', 'CCN', 'invalid'])
+        packed = rdktools.morgan_fingerprints(smiles, nbits=512, packed=True)
+
+        scores = rdktools.bulk_tanimoto(packed[0], packed)
+
+        assert scores.shape == (len(smiles),)
+        npt.assert_allclose(scores, rdktools.tanimoto_matrix(packed[:1], packed)[0])
+        with pytest.raises(ValueError):
+            rdktools.bulk_tanimoto(packed[:2], packed)
+
     def test_fingerprint_similarity(self):
         """Test fingerprint similarity calculations."""
         # Similar molecules should have similar fingerprints
         smiles = np.array(['CCO', 'CCC'])  # ethanol vs propane
         fps = rdktools.morgan_fingerprints(smiles, radius=2, nbits=1024)
         
-        # Calculate Tanimoto similarity
-        fp1, fp2 = fps[0], fps[1]
-        intersection = np.sum(fp1 & fp2)
-        union = np.sum(fp1 | fp2)
-        tanimoto = intersection / union if union > 0 else 0.0
+        # Tanimoto on packed words, one popcount per 64 bits (the SIMD
+        # kernel when the extension is built)
+        packed = rdktools.pack_fingerprints(fps)
+        tanimoto = rdktools.tanimoto_matrix(packed[:1], packed[1:])[0, 0]
         
         # Should have some similarity but not be identical
         assert 0.0 < tanimoto < 1.0
+        # Same value from the NumPy popcount (np.bitwise_count on NumPy 2)
+        assert tanimoto == rdktools.tanimoto(packed[0], packed[1])
+        assert rdktools.get_isa_tier() in (
+            'avx512_vpopcntdq', 'avx2', 'popcnt', 'scalar'
+        )
 
 
 class TestReasoningTrace:
     """Test ECFP reasoning trace generation."""
 
+    # Full traces produced by the original ostringstream implementation
+    # against RDKit Release_2025_09_1, one per (SMILES, keyword arguments)
+    GOLDEN_TRACES = [
+        (
+            "C[C@H](N)C(=O)O",
+            {},
+            [
+                "r0: r0:[#6:1]×2, r0:[#6@H:1]×1, r0:[#7:1]×1, r0:[#8:1]×2",
+                (
+                    "r1: r1:[#6:1]-[#6H]×1, r1:[#6]-[#8:1]×1, r1:[#7:1]-[#6H]×1, "
+                    "r1:[#6]=[#8:1]×1, r1:[#6]-[#6@H:1](-[#7])-[#6]×1, "
+                    "r1:[#6:1](-[#6H])(=[#8])-[#8]×1"
+                ),
+                "r2: r2:[#6]-[#6@H:1](-[#7])-[#6](=[#8])-[#8]×1",
+                "",
+                "# per-center chains",
+                "C0: r0:[#6:1] → r1:[#6:1]-[#6H]",
+                (
+                    "C1: r0:[#6@H:1] → r1:[#6]-[#6@H:1](-[#7])-[#6] → "
+                    "r2:[#6]-[#6@H:1](-[#7])-[#6](=[#8])-[#8]"
+                ),
+                "N2: r0:[#7:1] → r1:[#7:1]-[#6H]",
+                "C3: r0:[#6:1] → r1:[#6:1](-[#6H])(=[#8])-[#8]",
+                "O4: r0:[#8:1] → r1:[#6]=[#8:1]",
+                "O5: r0:[#8:1] → r1:[#6]-[#8:1]",
+            ],
+        ),
+        (
+            "c1ccccc1O",
+            {},
+            [
+                "r0: r0:[#6:1]×6, r0:[#8:1]×1",
+                (
+                    "r1: r1:[#6]-[#8:1]×1, r1:[#6:1](:[#6]):[#6]×1, "
+                    "r1:[#6]:[#6:1]:[#6]×4, r1:[#6]:[#6:1](:[#6])-[#8]×1"
+                ),
+                (
+                    "r2: r2:[#6](:[#6:1]:[#6]:[#6]):[#6]×1, "
+                    "r2:[#6]:[#6]:[#6:1]:[#6]:[#6]×2, "
+                    "r2:[#6:1](:[#6]:[#6]):[#6](:[#6])-[#8]×1, "
+                    "r2:[#6](:[#6]):[#6:1](:[#6]:[#6])-[#8]×1, "
+                    "r2:[#6]:[#6](:[#6:1]:[#6]:[#6])-[#8]×1"
+                ),
+                "",
+                "# per-center chains",
+                (
+                    "C0: r0:[#6:1] → r1:[#6:1](:[#6]):[#6] → "
+                    "r2:[#6:1](:[#6]:[#6]):[#6](:[#6])-[#8]"
+                ),
+                "C1: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → r2:[#6](:[#6:1]:[#6]:[#6]):[#6]",
+                "C2: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → r2:[#6]:[#6]:[#6:1]:[#6]:[#6]",
+                "C3: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → r2:[#6]:[#6]:[#6:1]:[#6]:[#6]",
+                (
+                    "C4: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → "
+                    "r2:[#6]:[#6](:[#6:1]:[#6]:[#6])-[#8]"
+                ),
+                (
+                    "C5: r0:[#6:1] → r1:[#6]:[#6:1](:[#6])-[#8] → "
+                    "r2:[#6](:[#6]):[#6:1](:[#6]:[#6])-[#8]"
+                ),
+                "O6: r0:[#8:1] → r1:[#6]-[#8:1]",
+            ],
+        ),
+        (
+            "c1ccc2ccccc2c1",
+            {"radius": 1},
+            [
+                "r0: r0:[#6:1]×10",
+                (
+                    "r1: r1:[#6:1](:[#6]):[#6]×1, r1:[#6]:[#6:1]:[#6]×7, "
+                    "r1:[#6]:[#6:1](:[#6]):[#6]×2"
+                ),
+                "",
+                "# per-center chains",
+                "C0: r0:[#6:1] → r1:[#6:1](:[#6]):[#6]",
+                "C1: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C2: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C3: r0:[#6:1] → r1:[#6]:[#6:1](:[#6]):[#6]",
+                "C4: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C5: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C6: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C7: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C8: r0:[#6:1] → r1:[#6]:[#6:1](:[#6]):[#6]",
+                "C9: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+            ],
+        ),
+        (
+            "Cc1ccc(Cl)cc1",
+            {},
+            [
+                "r0: r0:[#6:1]×7, r0:[#17:1]×1",
+                (
+                    "r1: r1:[#6:1]-[#6]×1, r1:[#6]-[#17:1]×1, r1:[#6]:[#6:1]:[#6]×4, "
+                    "r1:[#6]-[#6:1](:[#6]):[#6]×1, r1:[#6]:[#6:1](-[#17]):[#6]×1"
+                ),
+                (
+                    "r2: r2:[#6]-[#6:1](:[#6]:[#6]):[#6]:[#6]×1, "
+                    "r2:[#6]-[#6](:[#6:1]:[#6]:[#6]):[#6]×1, "
+                    "r2:[#6]-[#6](:[#6]):[#6:1]:[#6]:[#6]×1, "
+                    "r2:[#6]:[#6]:[#6:1](-[#17]):[#6]:[#6]×1, "
+                    "r2:[#6]:[#6]:[#6:1]:[#6](-[#17]):[#6]×1, "
+                    "r2:[#6]:[#6]:[#6:1]:[#6](:[#6])-[#17]×1"
+                ),
+                "",
+                "# per-center chains",
+                "C0: r0:[#6:1] → r1:[#6:1]-[#6]",
+                (
+                    "C1: r0:[#6:1] → r1:[#6]-[#6:1](:[#6]):[#6] → "
+                    "r2:[#6]-[#6:1](:[#6]:[#6]):[#6]:[#6]"
+                ),
+                (
+                    "C2: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → "
+                    "r2:[#6]-[#6](:[#6:1]:[#6]:[#6]):[#6]"
+                ),
+                (
+                    "C3: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → "
+                    "r2:[#6]:[#6]:[#6:1]:[#6](-[#17]):[#6]"
+                ),
+                (
+                    "C4: r0:[#6:1] → r1:[#6]:[#6:1](-[#17]):[#6] → "
+                    "r2:[#6]:[#6]:[#6:1](-[#17]):[#6]:[#6]"
+                ),
+                "Cl5: r0:[#17:1] → r1:[#6]-[#17:1]",
+                (
+                    "C6: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → "
+                    "r2:[#6]:[#6]:[#6:1]:[#6](:[#6])-[#17]"
+                ),
+                (
+                    "C7: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → "
+                    "r2:[#6]-[#6](:[#6]):[#6:1]:[#6]:[#6]"
+                ),
+            ],
+        ),
+        (
+            "C[C@H](N)C(=O)O",
+            {"include_per_center": False},
+            [
+                "r0: r0:[#6:1]×2, r0:[#6@H:1]×1, r0:[#7:1]×1, r0:[#8:1]×2",
+                (
+                    "r1: r1:[#6:1]-[#6H]×1, r1:[#6]-[#8:1]×1, r1:[#7:1]-[#6H]×1, "
+                    "r1:[#6]=[#8:1]×1, r1:[#6]-[#6@H:1](-[#7])-[#6]×1, "
+                    "r1:[#6:1](-[#6H])(=[#8])-[#8]×1"
+                ),
+                "r2: r2:[#6]-[#6@H:1](-[#7])-[#6](=[#8])-[#8]×1",
+            ],
+        ),
+        (
+            "c1ccccc1O",
+            {"kekulize": True},
+            [
+                "r0: r0:[#6:1]×6, r0:[#8:1]×1",
+                (
+                    "r1: r1:[#6]-[#8:1]×1, r1:[#6:1](:[#6]):[#6]×1, "
+                    "r1:[#6]:[#6:1]:[#6]×4, r1:[#6]:[#6:1](:[#6])-[#8]×1"
+                ),
+                (
+                    "r2: r2:[#6](:[#6:1]:[#6]:[#6]):[#6]×1, "
+                    "r2:[#6]:[#6]:[#6:1]:[#6]:[#6]×2, "
+                    "r2:[#6:1](:[#6]:[#6]):[#6](:[#6])-[#8]×1, "
+                    "r2:[#6](:[#6]):[#6:1](:[#6]:[#6])-[#8]×1, "
+                    "r2:[#6]:[#6](:[#6:1]:[#6]:[#6])-[#8]×1"
+                ),
+                "",
+                "# per-center chains",
+                (
+                    "C0: r0:[#6:1] → r1:[#6:1](:[#6]):[#6] → "
+                    "r2:[#6:1](:[#6]:[#6]):[#6](:[#6])-[#8]"
+                ),
+                "C1: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → r2:[#6](:[#6:1]:[#6]:[#6]):[#6]",
+                "C2: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → r2:[#6]:[#6]:[#6:1]:[#6]:[#6]",
+                "C3: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → r2:[#6]:[#6]:[#6:1]:[#6]:[#6]",
+                (
+                    "C4: r0:[#6:1] → r1:[#6]:[#6:1]:[#6] → "
+                    "r2:[#6]:[#6](:[#6:1]:[#6]:[#6])-[#8]"
+                ),
+                (
+                    "C5: r0:[#6:1] → r1:[#6]:[#6:1](:[#6])-[#8] → "
+                    "r2:[#6](:[#6]):[#6:1](:[#6]:[#6])-[#8]"
+                ),
+                "O6: r0:[#8:1] → r1:[#6]-[#8:1]",
+            ],
+        ),
+        (
+            "c1ccc2ccccc2c1",
+            {"radius": 1, "kekulize": True},
+            [
+                "r0: r0:[#6:1]×10",
+                (
+                    "r1: r1:[#6:1](:[#6]):[#6]×1, r1:[#6]:[#6:1]:[#6]×7, "
+                    "r1:[#6]:[#6:1](:[#6]):[#6]×2"
+                ),
+                "",
+                "# per-center chains",
+                "C0: r0:[#6:1] → r1:[#6:1](:[#6]):[#6]",
+                "C1: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C2: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C3: r0:[#6:1] → r1:[#6]:[#6:1](:[#6]):[#6]",
+                "C4: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C5: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C6: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C7: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+                "C8: r0:[#6:1] → r1:[#6]:[#6:1](:[#6]):[#6]",
+                "C9: r0:[#6:1] → r1:[#6]:[#6:1]:[#6]",
+            ],
+        ),
+        (
+            "Cc1ccc(Cl)cc1",
+            {"kekulize": True, "include_per_center": False},
+            [
+                "r0: r0:[#6:1]×7, r0:[#17:1]×1",
+                (
+                    "r1: r1:[#6:1]-[#6]×1, r1:[#6]-[#17:1]×1, r1:[#6]:[#6:1]:[#6]×4, "
+                    "r1:[#6]-[#6:1](:[#6]):[#6]×1, r1:[#6]:[#6:1](-[#17]):[#6]×1"
+                ),
+                (
+                    "r2: r2:[#6]-[#6:1](:[#6]:[#6]):[#6]:[#6]×1, "
+                    "r2:[#6]-[#6](:[#6:1]:[#6]:[#6]):[#6]×1, "
+                    "r2:[#6]-[#6](:[#6]):[#6:1]:[#6]:[#6]×1, "
+                    "r2:[#6]:[#6]:[#6:1](-[#17]):[#6]:[#6]×1, "
+                    "r2:[#6]:[#6]:[#6:1]:[#6](-[#17]):[#6]×1, "
+                    "r2:[#6]:[#6]:[#6:1]:[#6](:[#6])-[#17]×1"
+                ),
+            ],
+        ),
+    ]
+
     def test_ecfp_reasoning_trace_basic(self):
         """Trace contains aggregate and per-center sections."""
         trace, fingerprint = rdktools.ecfp_reasoning_trace("CCO")
@@ -281,6 +877,23 @@ class TestReasoningTrace:
         assert fingerprint.shape == (512,)
         assert fingerprint.sum() > 0
 
+    def test_ecfp_reasoning_trace_as_bytes(self):
+        """The bytes trace is the UTF-8 encoding of the str trace."""
+        trace, fingerprint = rdktools.ecfp_reasoning_trace("c1ccccc1O")
+        raw, raw_fingerprint = rdktools.ecfp_reasoning_trace(
+            "c1ccccc1O", as_bytes=True
+        )
+
+        assert isinstance(raw, bytes)
+        assert raw.decode() == trace
+        npt.assert_array_equal(raw_fingerprint, fingerprint)
+
+    def test_ecfp_reasoning_trace_golden(self):
+        """Pinned traces match byte for byte, with and without kekulization."""
+        for smiles, kwargs, lines in self.GOLDEN_TRACES:
+            trace, _ = rdktools.ecfp_reasoning_trace(smiles, **kwargs)
+            assert trace == "\n".join(lines), (smiles, kwargs)
+
 
 class TestInputValidation:
     """Test input validation and error handling."""
@@ -308,6 +921,10 @@ class TestInputValidation:
         
         with pytest.raises(TypeError):
             rdktools.molecular_weights(smiles_2d)
+
+        # Nested lists are rejected too
+        with pytest.raises(TypeError):
+            rdktools.molecular_weights([['CCO', 'CCC'], ['c1ccccc1', 'CC(=O)O']])
     
     def test_type_conversion(self):
         """Test automatic type conversion for different input types."""
@@ -318,8 +935,31 @@ class TestInputValidation:
         weights_obj = rdktools.molecular_weights(smiles_object)
         weights_uni = rdktools.molecular_weights(smiles_unicode)
         
+        smiles_bytes = np.array([b'CCO', b'c1ccccc1'])
+        weights_bytes = rdktools.molecular_weights(smiles_bytes)
+        
         # Results should be the same regardless of input string type
         npt.assert_array_equal(weights_obj, weights_uni)
+        npt.assert_array_equal(weights_obj, weights_bytes)
+
+        # Fixed-width arrays are read from their buffer, including strided views
+        reversed_uni = rdktools.molecular_weights(smiles_unicode[::-1], dedup=False)
+        npt.assert_array_equal(reversed_uni, weights_obj[::-1])
+
+    def test_non_string_elements(self):
+        """Non-string elements are converted with str(), so None is invalid."""
+        expected = rdktools.molecular_weights(['CCO', 'None', '42', 'CCN'])
+        for smiles in (
+            ['CCO', None, 42, b'CCN'],
+            np.array(['CCO', None, 42, b'CCN'], dtype=object),
+        ):
+            for dedup in (True, False):
+                weights = rdktools.molecular_weights(smiles, dedup=dedup)
+                npt.assert_array_equal(weights, expected)
+        assert np.isnan(expected[1:3]).all()
+        npt.assert_array_equal(
+            rdktools.is_valid(np.array([None, 'CCO'], dtype=object)), [False, True]
+        )
 
 
 class TestConsistency:
@@ -351,6 +991,34 @@ class TestConsistency:
         # All should give the same canonical form
         assert canonical[0] == canonical[1] == canonical[2]
 
+    def test_dedup_matches_direct(self):
+        """Test that deduplicated and direct calculations agree."""
+        smiles = np.array(['CCO', 'invalid', 'c1ccccc1', 'CCO', 'invalid', 'CCO'])
+
+        npt.assert_array_equal(
+            rdktools.molecular_weights(smiles),
+            rdktools.molecular_weights(smiles, dedup=False),
+        )
+        npt.assert_array_equal(
+            rdktools.is_valid(smiles), rdktools.is_valid(smiles, dedup=False)
+        )
+        assert list(rdktools.canonical_smiles(smiles)) == list(
+            rdktools.canonical_smiles(smiles, dedup=False)
+        )
+        npt.assert_array_equal(
+            rdktools.morgan_fingerprints(smiles, packed=True),
+            rdktools.morgan_fingerprints(smiles, packed=True, dedup=False),
+        )
+
+        out = np.empty(len(smiles))
+        assert rdktools.logp(smiles, out=out) is out
+        npt.assert_array_equal(out, rdktools.logp(smiles, dedup=False))
+
+        batch = rdktools.batch_process(smiles, include_fingerprints=True)
+        direct = rdktools.batch_process(smiles, include_fingerprints=True, dedup=False)
+        for key in direct:
+            npt.assert_array_equal(batch[key], direct[key])
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
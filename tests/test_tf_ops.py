@@ -51,22 +51,41 @@ def test_string_process_custom_fingerprint_size():
     assert int(tf.reduce_sum(fingerprints[0]).numpy()) >= 0
 
 
+def test_string_process_function_matches_eager():
+    inputs = tf.constant(["CCO", "c1ccccc1", "invalid"])
+    traces, fingerprints = tf_ops.string_process(inputs, fingerprint_size=512)
+
+    process = tf_ops.string_process_function(512)
+    assert tf_ops.string_process_function(512) is process
+
+    compiled_traces, compiled_fps = process(inputs)
+    np.testing.assert_array_equal(compiled_traces.numpy(), traces.numpy())
+    np.testing.assert_array_equal(compiled_fps.numpy(), fingerprints.numpy())
+    assert compiled_fps.shape == (3, 512)
+
+    # Different batch lengths reuse the same trace
+    _, fps_one = process(inputs[:1])
+    assert int(tf.reduce_sum(fps_one).numpy()) == int(
+        tf.reduce_sum(fingerprints[0]).numpy()
+    )
+
+
 def test_create_tf_dataset_batches():
     smiles = ["CCO", "c1ccccc1", "CC(=O)O", "CCC"]
     dataset = tf_ops.create_tf_dataset_op(smiles, batch_size=2, prefetch=False)
 
-    batches = list(dataset)
-    assert len(batches) == 2
+    assert [int(traces.shape[0]) for traces, _ in dataset] == [2, 2]
 
-    trace_batches, fingerprint_batches = zip(*batches)
-    trace_concat = tf.concat(trace_batches, axis=0).numpy()
-    fingerprint_concat = tf.concat(fingerprint_batches, axis=0).numpy()
+    # Rebatch inside tf.data to get every element as one tensor pair
+    traces, fingerprints = next(iter(dataset.unbatch().batch(len(smiles))))
+    trace_values = traces.numpy()
+    fingerprint_values = fingerprints.numpy()
 
-    assert trace_concat.shape == (len(smiles),)
-    assert fingerprint_concat.shape == (len(smiles), FP_SIZE)
-    assert fingerprint_concat.dtype == tf.uint8
+    assert trace_values.shape == (len(smiles),)
+    assert fingerprint_values.shape == (len(smiles), FP_SIZE)
+    assert fingerprint_values.dtype == tf.uint8
 
-    for text_bytes, bits in zip(trace_concat, fingerprint_concat):
+    for text_bytes, bits in zip(trace_values, fingerprint_values):
         text = text_bytes.decode()
         assert text.startswith("r0:")
         assert bits.shape == (FP_SIZE,)
@@ -87,3 +106,40 @@ def test_create_tf_dataset_batches_custom_size():
         assert trace_batch.shape == (1,)
         assert fp_batch.shape == (1, 512)
         assert fp_batch.dtype == tf.uint8
+
+
+def test_create_tf_dataset_from_iterables():
+    smiles = ["CCO", "c1ccccc1", "CC(=O)O"]
+    expected = list(
+        tf_ops.create_tf_dataset_op(smiles, batch_size=2, prefetch=False)
+    )
+
+    # Generic iterables become a tensor unless streaming is requested
+    for stream in (False, True):
+        batches = list(
+            tf_ops.create_tf_dataset_op(
+                iter(smiles), batch_size=2, prefetch=False, stream=stream
+            )
+        )
+        assert len(batches) == len(expected)
+        for (traces, fps), (want_traces, want_fps) in zip(batches, expected):
+            np.testing.assert_array_equal(traces.numpy(), want_traces.numpy())
+            np.testing.assert_array_equal(fps.numpy(), want_fps.numpy())
+
+
+def test_create_tf_dataset_shuffled_keeps_pairs():
+    smiles = ["CCO", "c1ccccc1", "CC(=O)O", "CCC"]
+    dataset = tf_ops.create_tf_dataset_op(
+        smiles, batch_size=3, shuffle=True, prefetch=False
+    )
+
+    traces, fingerprints = next(iter(dataset.unbatch().batch(len(smiles))))
+    assert traces.shape == (len(smiles),)
+    assert fingerprints.shape == (len(smiles), FP_SIZE)
+
+    # Every trace still sits next to its own fingerprint after shuffling
+    unshuffled_traces, unshuffled_fps = tf_ops.string_process(tf.constant(smiles))
+    by_trace = dict(zip(unshuffled_traces.numpy(), unshuffled_fps.numpy()))
+    assert sorted(by_trace) == sorted(traces.numpy())
+    for trace, bits in zip(traces.numpy(), fingerprints.numpy()):
+        np.testing.assert_array_equal(bits, by_trace[trace])